@@ -1,34 +1,192 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import asyncpg
 
-from app.config import DATABASE_URL
+from app import timing
+from app.config import (
+    DATABASE_READ_URL,
+    DATABASE_URL,
+    DB_ACQUIRE_WARN_MS,
+    DB_MAX_INACTIVE_LIFETIME,
+    DB_READ_POOL_MAX,
+    DB_READ_POOL_MIN,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_WRITE_POOL_MAX,
+    DB_WRITE_POOL_MIN,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
 
 log = logging.getLogger(__name__)
 
 pool: asyncpg.Pool | None = None
+read_pool: asyncpg.Pool | None = None
+
+# Per-pool acquire-wait counters: {"read": {"acquires": n, "wait_total_ms": ..., "wait_max_ms": ...}}
+_wait_stats: dict[str, dict[str, float]] = {}
+
+
+_MIGRATIONS_DIR = Path(__file__).parent / "sql" / "migrations"
+# Arbitrary key for pg_advisory_xact_lock so concurrent replicas migrate one at a time.
+_MIGRATION_LOCK_ID = 0x6B697473
 
 
 def get_pool() -> asyncpg.Pool:
+    """Return the write (primary) pool."""
     assert pool is not None, "Database not initialized — call init_db() first"
     return pool
 
 
+def get_read_pool() -> asyncpg.Pool:
+    assert read_pool is not None, "Database not initialized — call init_db() first"
+    return read_pool
+
+
+def _record_wait(name: str, waited_ms: float) -> None:
+    stats = _wait_stats.setdefault(
+        name, {"acquires": 0, "wait_total_ms": 0.0, "wait_max_ms": 0.0}
+    )
+    stats["acquires"] += 1
+    stats["wait_total_ms"] += waited_ms
+    stats["wait_max_ms"] = max(stats["wait_max_ms"], waited_ms)
+    if waited_ms > DB_ACQUIRE_WARN_MS:
+        log.warning("Waited %.1f ms for a %s pool connection", waited_ms, name)
+
+
+@asynccontextmanager
+async def _acquire(p: asyncpg.Pool, name: str) -> AsyncIterator[asyncpg.Connection]:
+    start = time.perf_counter()
+    async with p.acquire() as conn:
+        waited_ms = (time.perf_counter() - start) * 1000
+        _record_wait(name, waited_ms)
+        timing.record("db-acquire", waited_ms)
+        with timing.phase("db"):
+            yield conn
+
+
+def read_conn():
+    """Acquire a connection from the read pool (replica when configured)."""
+    return _acquire(get_read_pool(), "read")
+
+
+def write_conn():
+    """Acquire a connection from the write pool (always the primary)."""
+    return _acquire(get_pool(), "write")
+
+
+def reader_conn(primary: bool = False):
+    """A read connection, or a primary one for reads that must see a write just made."""
+    return write_conn() if primary else read_conn()
+
+
+def pool_stats() -> dict[str, dict]:
+    result: dict[str, dict] = {}
+    for name, p in (("read", read_pool), ("write", pool)):
+        if p is None:
+            continue
+        waits = _wait_stats.get(name, {})
+        acquires = int(waits.get("acquires", 0))
+        result[name] = {
+            "size": p.get_size(),
+            "idle": p.get_idle_size(),
+            "min_size": p.get_min_size(),
+            "max_size": p.get_max_size(),
+            "acquires": acquires,
+            "wait_avg_ms": waits.get("wait_total_ms", 0.0) / acquires if acquires else 0.0,
+            "wait_max_ms": waits.get("wait_max_ms", 0.0),
+        }
+    return result
+
+
+async def _create_pool(dsn: str, min_size: int, max_size: int) -> asyncpg.Pool:
+    return await asyncpg.create_pool(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+        max_inactive_connection_lifetime=DB_MAX_INACTIVE_LIFETIME,
+    )
+
+
+def _migration_files() -> list[tuple[int, str, Path]]:
+    """Return ``(version, name, path)`` for every ``NNNN_name.sql`` migration, in order."""
+    result = []
+    for path in sorted(_MIGRATIONS_DIR.glob("*.sql")):
+        version, _, name = path.stem.partition("_")
+        result.append((int(version), name, path))
+    return result
+
+
+async def _schema_version(conn: asyncpg.Connection) -> int:
+    try:
+        return await conn.fetchval("SELECT coalesce(max(version), 0) FROM schema_migrations")
+    except asyncpg.UndefinedTableError:
+        return 0
+
+
+async def migrate(conn: asyncpg.Connection) -> None:
+    """Apply any migrations newer than the recorded schema version.
+
+    The common case (nothing to do) costs a single round trip.
+    """
+    migrations = _migration_files()
+    latest = migrations[-1][0] if migrations else 0
+    if await _schema_version(conn) >= latest:
+        return
+
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", _MIGRATION_LOCK_ID)
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version     INTEGER PRIMARY KEY,
+                name        TEXT NOT NULL,
+                applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+        # Re-check under the lock: another replica may have just migrated.
+        current = await _schema_version(conn)
+        for version, name, path in migrations:
+            if version <= current:
+                continue
+            log.info("Applying migration %04d_%s", version, name)
+            await conn.execute(path.read_text())
+            await conn.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                version, name,
+            )
+
+
 async def init_db() -> None:
-    global pool
-    pool = await asyncpg.create_pool(DATABASE_URL, min_size=2, max_size=10)
-    schema = (Path(__file__).parent / "sql" / "schema.sql").read_text()
+    global pool, read_pool
+    pool, read_pool = await asyncio.gather(
+        _create_pool(DATABASE_URL, DB_WRITE_POOL_MIN, DB_WRITE_POOL_MAX),
+        _create_pool(DATABASE_READ_URL, DB_READ_POOL_MIN, DB_READ_POOL_MAX),
+    )
     async with pool.acquire() as conn:
-        await conn.execute(schema)
-    log.info("Database initialized")
+        await migrate(conn)
+    log.info(
+        "Database initialized (read=%s, write=%s)",
+        "replica" if DATABASE_READ_URL != DATABASE_URL else "primary",
+        "primary",
+    )
 
 
 async def close_db() -> None:
-    global pool
+    global pool, read_pool
+    if read_pool:
+        await read_pool.close()
+        read_pool = None
     if pool:
         await pool.close()
         pool = None
-        log.info("Database pool closed")
+        log.info("Database pools closed")
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Iterable
+
+from app.impacts import normalize_impacts
+
+log = logging.getLogger(__name__)
+
+CALENDAR_KINDS = ("economics", "earnings")
+
+
+class CalendarSubscriber:
+    """One live stream. Receives pre-encoded SSE frames for matching rows."""
+
+    __slots__ = ("queue", "kinds", "currencies", "impacts", "symbols")
+
+    def __init__(
+        self,
+        kinds: Iterable[str],
+        currencies: Iterable[str] | None,
+        impacts: Iterable[str] | None,
+        symbols: Iterable[str] | None,
+        max_queue: int,
+    ) -> None:
+        # None in the queue means the subscriber fell behind and was cut off.
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(max_queue)
+        self.kinds = frozenset(kinds)
+        self.currencies = frozenset(c.upper() for c in currencies) if currencies else None
+        self.impacts = frozenset(normalize_impacts(impacts) or ()) or None
+        self.symbols = frozenset(s.upper() for s in symbols) if symbols else None
+
+    def matches(self, kind: str, item: dict) -> bool:
+        if kind not in self.kinds:
+            return False
+        if kind == "economics":
+            if self.currencies is not None and (item.get("currency") or "").upper() not in self.currencies:
+                return False
+            if self.impacts is not None and item.get("impact") not in self.impacts:
+                return False
+        elif self.symbols is not None and (item.get("symbol") or "").upper() not in self.symbols:
+            return False
+        return True
+
+
+class CalendarBroker:
+    """In-process fan-out of changed calendar rows to SSE subscribers.
+
+    Each row is JSON-encoded once per publish no matter how many subscribers
+    receive it. A subscriber whose queue fills up is disconnected instead of
+    blocking the writer.
+    """
+
+    def __init__(self, max_queue: int = 1000) -> None:
+        self._max_queue = max_queue
+        self._subscribers: set[CalendarSubscriber] = set()
+
+    def subscribe(
+        self,
+        kinds: Iterable[str] = CALENDAR_KINDS,
+        currencies: Iterable[str] | None = None,
+        impacts: Iterable[str] | None = None,
+        symbols: Iterable[str] | None = None,
+    ) -> CalendarSubscriber:
+        sub = CalendarSubscriber(kinds, currencies, impacts, symbols, self._max_queue)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: CalendarSubscriber) -> None:
+        self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, kind: str, items: list[dict]) -> None:
+        if not items or not self._subscribers:
+            return
+        frames = [
+            (item, f"event: {kind}\ndata: {json.dumps(item, default=str)}\n\n".encode())
+            for item in items
+        ]
+        for sub in list(self._subscribers):
+            for item, frame in frames:
+                if not sub.matches(kind, item):
+                    continue
+                try:
+                    sub.queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    log.warning("Dropping slow calendar stream subscriber")
+                    self._evict(sub)
+                    break
+
+    def _evict(self, sub: CalendarSubscriber) -> None:
+        self._subscribers.discard(sub)
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+
+calendar_events = CalendarBroker()
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+# Canonical economic-event impact labels, as stored by the ForexFactory parser.
+IMPACT_LABELS = ("High", "Medium", "Low", "Non-Economic")
+
+_BY_LOWER = {label.lower(): label for label in IMPACT_LABELS}
+
+
+def normalize_impacts(impacts: Iterable[str] | None) -> list[str] | None:
+    """Map user-supplied impact filters to canonical labels, case-insensitively.
+
+    Unknown values pass through unchanged (and so match nothing).
+    """
+    if not impacts:
+        return None
+    return [_BY_LOWER.get(i.strip().lower(), i) for i in impacts]
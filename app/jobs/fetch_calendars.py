@@ -2,21 +2,40 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING
 
-import pandas as pd
-import yfinance as yf
-import curl_cffi as curl
+from app.config import (
+    EARNINGS_CALENDAR_BATCH_SIZE,
+    RELEASE_POLL_INTERVAL_SECONDS,
+    RELEASE_WINDOW_AFTER_SECONDS,
+    RELEASE_WINDOW_BEFORE_SECONDS,
+    RELEASE_WINDOW_IMPACTS,
+)
+from app.jobs.governor import is_throttle_error, yahoo
+from app.storage import (
+    read_economics_calendar,
+    read_upcoming_releases,
+    write_earnings_calendar_rows,
+    write_economics_calendar,
+)
 
-from app.storage import write_earnings_calendar, write_economics_calendar
-from app.jobs.parsers.forexfactory import extract_calendar_table, parse_economic_calendar
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import pandas as pd
 
 log = logging.getLogger(__name__)
 
+# pandas, yfinance, curl_cffi and lxml are imported inside the fetch functions,
+# which only run in worker threads, so importing the API does not pay for them.
+
 
 def _nan_to_none(val):
     if val is None:
         return None
+    import pandas as pd
+
     try:
         if pd.isna(val):
             return None
@@ -48,12 +67,17 @@ def _to_date(val) -> date | None:
         return None
 
 
-def _fetch_earnings_raw() -> dict[date, dict[str, list[dict]]]:
-    """Synchronous yfinance fetch — returns dict[day, dict[company, list[item]]]."""
+def _iter_earnings_pages() -> Iterator[list[dict]]:
+    """Synchronous yfinance fetch — yields one page of flat items at a time.
+
+    Each item carries its ``company``. Run each step in a worker thread; only
+    the current page is held in memory.
+    """
+    import yfinance as yf
+
     yesterday = datetime.now() - timedelta(days=1)
     cal = yf.Calendars(start=yesterday)
 
-    result: dict[date, dict[str, list[dict]]] = {}
     offset = 0
     while True:
         df = cal.get_earnings_calendar(
@@ -61,12 +85,13 @@ def _fetch_earnings_raw() -> dict[date, dict[str, list[dict]]]:
             market_cap=1_000_000_000, filter_most_active=False,
         )
         if df is None or df.empty:
-            break
+            return
         records = _df_to_records(df)
+        page = []
         for r in records:
             sym = r.get("Symbol") or r.get("index", "")
-            company = r.get("Company") or sym
             item = {
+                "company": r.get("Company") or sym,
                 "symbol": sym,
                 "marketcap": r.get("Marketcap"),
                 "event_name": r.get("Event Name"),
@@ -76,29 +101,62 @@ def _fetch_earnings_raw() -> dict[date, dict[str, list[dict]]]:
                 "reported_eps": r.get("Reported EPS"),
                 "surprise_pct": r.get("Surprise(%)"),
             }
-            key = _to_date(item["date"])
-            if key is None:
+            if _to_date(item["date"]) is None:
                 continue
-            result.setdefault(key, {}).setdefault(company, []).append(item)
+            page.append(item)
+        yield page
         if len(records) < 100:
-            break
+            return
         offset += 100
-    return result
 
 
 async def sync_earnings_calendar() -> None:
+    """Stream earnings-calendar pages into the database in bounded batches.
+
+    Every page is a paced upstream call; rows are flushed each
+    ``EARNINGS_CALENDAR_BATCH_SIZE`` items, so they become visible while later
+    pages are still being fetched.
+    """
     log.info("Syncing market earnings calendar")
+    pages = _iter_earnings_pages()
+    batch: list[dict] = []
+    total = 0
+    days: set[date] = set()
     try:
-        data = await asyncio.to_thread(_fetch_earnings_raw)
-        if not data:
-            log.warning("No earnings calendar data returned")
-            return
-
-        await write_earnings_calendar(data)
-        total = sum(len(e) for day in data.values() for e in day.values())
-        log.info("Synced %d earnings calendar items across %d days", total, len(data))
+        while True:
+            await yahoo.acquire()
+            try:
+                page = await asyncio.to_thread(next, pages, None)
+            except Exception as exc:
+                if is_throttle_error(exc):
+                    yahoo.record_throttle()
+                    log.warning("Yahoo throttled earnings calendar sync after %d items: %s", total, exc)
+                else:
+                    yahoo.record_failure()
+                    log.error("Failed to fetch earnings calendar", exc_info=True)
+                return
+            if page is None:
+                break
+            yahoo.record_success()
+            batch.extend(page)
+            days.update(d for item in page if (d := _to_date(item["date"])) is not None)
+            if len(batch) >= EARNINGS_CALENDAR_BATCH_SIZE:
+                await write_earnings_calendar_rows(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            await write_earnings_calendar_rows(batch)
+            total += len(batch)
     except Exception:
-        log.error("Failed to sync earnings calendar", exc_info=True)
+        log.error("Failed to store earnings calendar", exc_info=True)
+        return
+    finally:
+        pages.close()
+
+    if not total:
+        log.warning("No earnings calendar data returned")
+        return
+    log.info("Synced %d earnings calendar items across %d days", total, len(days))
 
 
 def _parse_day(val) -> date | None:
@@ -117,6 +175,10 @@ def _parse_day(val) -> date | None:
 
 def _fetch_economics_raw() -> list[dict]:
     """Synchronous HTTP fetch + parse."""
+    import curl_cffi as curl
+
+    from app.jobs.parsers.forexfactory import extract_calendar_table, parse_economic_calendar
+
     url = "https://www.forexfactory.com/calendar"
     response = curl.get(url, impersonate="chrome")
     if response.status_code != 200:
@@ -126,6 +188,17 @@ def _fetch_economics_raw() -> list[dict]:
     return parse_economic_calendar(table)
 
 
+def _group_by_day(events: list[dict]) -> dict[date, list[dict]]:
+    by_day: dict[date, list[dict]] = {}
+    for ev in events:
+        dt = ev.get("date")
+        day = dt.date() if isinstance(dt, datetime) else _parse_day(dt)
+        if day is None:
+            continue
+        by_day.setdefault(day, []).append(ev)
+    return by_day
+
+
 async def sync_economics_calendar() -> None:
     try:
         log.info("Syncing economic events calendar")
@@ -134,20 +207,111 @@ async def sync_economics_calendar() -> None:
             log.warning("No economic events found in calendar data")
             return
 
-        by_day: dict[date, list[dict]] = {}
-        for ev in events:
-            dt = ev.get("date")
-            day = dt.date() if isinstance(dt, datetime) else _parse_day(dt)
-            if day is None:
-                continue
-            by_day.setdefault(day, []).append(ev)
-
+        by_day = _group_by_day(events)
         await write_economics_calendar(by_day)
         log.info("Synced %d economic events across %d days", len(events), len(by_day))
     except Exception:
         log.error("Failed to sync economic events calendar", exc_info=True)
 
 
+# --- release-window fast polling ---
+
+_DIFF_FIELDS = ("is_all_day", "currency", "impact", "actual", "forecast", "previous")
+
+_release_lock = asyncio.Lock()
+
+
+def _event_key(ev: dict) -> tuple[datetime, str] | None:
+    dt = ev.get("date")
+    if isinstance(dt, str):
+        dt = datetime.fromisoformat(dt)
+    if not isinstance(dt, datetime) or not ev.get("event"):
+        return None
+    return dt.astimezone(timezone.utc), ev["event"]
+
+
+def _diff_events(
+    events: list[dict], stored: dict[tuple[datetime, str], dict],
+) -> list[dict]:
+    """Return parsed events that are new or would change a stored row.
+
+    Mirrors the upsert's COALESCE semantics: a blank parsed field never
+    counts as a change.
+    """
+    changed = []
+    for ev in events:
+        key = _event_key(ev)
+        if key is None:
+            continue
+        old = stored.get(key)
+        if old is None or any(
+            ev.get(f) is not None and ev.get(f) != old.get(f) for f in _DIFF_FIELDS
+        ):
+            changed.append(ev)
+    return changed
+
+
+async def _stored_snapshot(events: list[dict]) -> dict[tuple[datetime, str], dict]:
+    days = list(_group_by_day(events))
+    if not days:
+        return {}
+    stored = await read_economics_calendar(start=min(days), end=max(days))
+    return {
+        key: item
+        for items in stored.values()
+        for item in items
+        if (key := _event_key(item)) is not None
+    }
+
+
+async def poll_release_windows() -> None:
+    """Poll ForexFactory at short intervals while a release window is open.
+
+    Scheduled every minute. A window opens shortly before an upcoming
+    High/Medium impact event that has no ``actual`` yet and closes a few
+    minutes after it, or as soon as every such event has its ``actual``.
+    Each poll writes only the rows that differ from what is stored.
+    """
+    if _release_lock.locked():
+        return
+    async with _release_lock:
+        before = timedelta(seconds=RELEASE_WINDOW_BEFORE_SECONDS)
+        after = timedelta(seconds=RELEASE_WINDOW_AFTER_SECONDS)
+        now = datetime.now(timezone.utc)
+        releases = await read_upcoming_releases(now - after, now + before, RELEASE_WINDOW_IMPACTS)
+        if not releases:
+            return
+
+        pending = {k for r in releases if (k := _event_key(r)) is not None}
+        window_end = max(k[0] for k in pending) + after
+        log.info("Release window open for %d events until %s", len(pending), window_end)
+
+        stored: dict[tuple[datetime, str], dict] | None = None
+        while datetime.now(timezone.utc) < window_end:
+            try:
+                events = await asyncio.to_thread(_fetch_economics_raw)
+                if stored is None:
+                    stored = await _stored_snapshot(events)
+                changed = _diff_events(events, stored)
+                if changed:
+                    await write_economics_calendar(_group_by_day(changed))
+                    for ev in changed:
+                        key = _event_key(ev)
+                        merged = dict(stored.get(key) or {})
+                        merged.update({f: ev[f] for f in _DIFF_FIELDS if ev.get(f) is not None})
+                        stored[key] = merged
+                    log.info("Release poll wrote %d changed economic events", len(changed))
+            except Exception:
+                log.error("Release-window poll failed", exc_info=True)
+
+            if stored is not None and all(
+                (stored.get(k) or {}).get("actual") is not None for k in pending
+            ):
+                log.info("All %d release actuals captured", len(pending))
+                break
+            await asyncio.sleep(RELEASE_POLL_INTERVAL_SECONDS)
+
+
 async def sync_all_calendars() -> None:
     await sync_earnings_calendar()
     await sync_economics_calendar()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+
+from app.config import PRICE_BAR_BACKFILL_DAYS, PRICE_BAR_CHUNK_SIZE, PRICE_BAR_INTERVALS
+from app.jobs.governor import is_throttle_error, yahoo
+from app.storage import read_price_bar_cursors, write_price_bars
+
+log = logging.getLogger(__name__)
+
+# Yahoo serves intraday history only this far back (days).
+_MAX_LOOKBACK_DAYS = {
+    "1m": 7, "2m": 59, "5m": 59, "15m": 59, "30m": 59, "90m": 59,
+    "60m": 729, "1h": 729,
+}
+
+_sync_lock = asyncio.Lock()
+
+
+def _download_chunk(tickers: list[str], interval: str, start: datetime) -> list[tuple]:
+    """Synchronous batched yfinance download; returns rows for ``write_price_bars``."""
+    import pandas as pd
+    import yfinance as yf
+
+    df = yf.download(
+        tickers, start=start, interval=interval, group_by="ticker",
+        auto_adjust=False, actions=False, threads=False, progress=False,
+        multi_level_index=True,
+    )
+    if df is None or df.empty:
+        return []
+
+    index = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.DatetimeIndex(df.index)
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    stamps = index.to_pydatetime()
+
+    records: list[tuple] = []
+    available = set(df.columns.get_level_values(0))
+    for ticker in tickers:
+        if ticker not in available:
+            continue
+        sub = df[ticker]
+        keep = sub["Close"].notna().to_numpy()  # rows where this ticker did not trade
+        ohlc = sub[["Open", "High", "Low", "Close", "Adj Close"]].to_numpy(dtype="float64")
+        volume = sub["Volume"].to_numpy(dtype="float64")
+        for ts, (o, h, lo, c, adj), v in zip(stamps[keep], ohlc[keep], volume[keep]):
+            records.append((
+                ticker, interval, ts,
+                *(None if math.isnan(x) else float(x) for x in (o, h, lo, c, adj)),
+                None if math.isnan(v) else int(v),
+            ))
+    return records
+
+
+def _plan_chunks(
+    cursors: dict[str, datetime | None], interval: str, now: datetime,
+) -> list[tuple[list[str], datetime]]:
+    """Group tickers into download chunks of similar start time.
+
+    Each ticker resumes from its last stored bar (re-fetched, since it may
+    still have been forming); tickers without bars are backfilled. Sorting by
+    start keeps a chunk from re-downloading much history for any one ticker.
+    """
+    floor = now - timedelta(days=min(
+        PRICE_BAR_BACKFILL_DAYS, _MAX_LOOKBACK_DAYS.get(interval, PRICE_BAR_BACKFILL_DAYS),
+    ))
+    starts = sorted(
+        ((max(last, floor) if last else floor, ticker) for ticker, last in cursors.items()),
+    )
+    size = max(1, PRICE_BAR_CHUNK_SIZE)
+    return [
+        ([t for _s, t in starts[i:i + size]], starts[i][0])
+        for i in range(0, len(starts), size)
+    ]
+
+
+async def sync_price_bars() -> None:
+    """Incrementally ingest bars for every watchlist ticker and configured interval.
+
+    One batched download per chunk of ``PRICE_BAR_CHUNK_SIZE`` tickers, paced
+    by the Yahoo governor in the background lane at one unit per chunk.
+    """
+    if _sync_lock.locked():
+        log.info("Price bar sync already running, skipping")
+        return
+    async with _sync_lock:
+        now = datetime.now(timezone.utc)
+        for interval in PRICE_BAR_INTERVALS:
+            cursors = await read_price_bar_cursors(interval)
+            if not cursors:
+                continue
+            written = 0
+            for tickers, start in _plan_chunks(cursors, interval, now):
+                await yahoo.acquire()
+                try:
+                    records = await asyncio.to_thread(_download_chunk, tickers, interval, start)
+                except Exception as exc:
+                    if is_throttle_error(exc):
+                        yahoo.record_throttle()
+                        log.warning("Yahoo throttled %s bar download: %s", interval, exc)
+                        break
+                    yahoo.record_failure()
+                    log.error("Failed to download %s bars for %d tickers", interval, len(tickers), exc_info=True)
+                    continue
+                yahoo.record_success()
+                try:
+                    written += await write_price_bars(records)
+                except Exception:
+                    log.error("Failed to store %s bars for %d tickers", interval, len(tickers), exc_info=True)
+            log.info("Synced %s bars for %d tickers: %d rows written", interval, len(cursors), written)
@@ -2,21 +2,61 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections import deque
 from datetime import datetime
-from fractions import Fraction
-from typing import cast
+from typing import TYPE_CHECKING, Literal, cast
 
-import pandas as pd
-import yfinance as yf
+from app.config import (
+    STOCK_DATASETS,
+    STOCK_REFRESH_SECONDS,
+    STOCK_SYNC_CONCURRENCY,
+    SYNC_RUN_LEASE_SECONDS,
+    YAHOO_CLIENT,
+)
+from app.jobs.governor import is_throttle_error, yahoo
+from app.jobs.lanes import Lane, fetch_lanes
+from app.jobs.yahoo import ratio_str, yahoo_client
+from app.storage import (
+    SyncRunBusy,
+    finish_sync_run,
+    heartbeat_sync_run,
+    read_due_datasets,
+    resume_sync_run,
+    start_sync_run,
+    write_stock,
+    write_sync_checkpoint,
+)
 
-from app.storage import read_watchlist, write_stock
+if TYPE_CHECKING:
+    from collections.abc import Collection
 
 log = logging.getLogger(__name__)
 
+SyncStatus = Literal["ok", "throttled", "failed"]
+
+_MAX_REQUEUES = 3
+
+# The upstream request behind each dataset. Dividends and splits share one in
+# both paths (yfinance's cached max-range history, or the native chart call).
+_DATASET_CALLS = {
+    "calendar": "quoteSummary",
+    "earnings": "earnings",
+    "dividends": "chart",
+    "splits": "chart",
+}
+
+_sync_lock = asyncio.Lock()
+
+# pandas and yfinance are imported inside the fetch functions, which only run in
+# worker threads, so importing the API does not pay for them at startup.
+
 
 def _nan_to_none(val):
     if val is None:
         return None
+    import pandas as pd
+
     try:
         if pd.isna(val):
             return None
@@ -25,93 +65,275 @@ def _nan_to_none(val):
     return val
 
 
-def _ratio_str(value: float) -> str:
-    frac = Fraction(value).limit_denominator(1000)
-    return f"{frac.numerator}:{frac.denominator}"
+def fetch_single_stock(ticker: str, datasets: Collection[str] = STOCK_DATASETS) -> dict:
+    """Fetch the requested datasets for a single ticker and return as dict.
 
+    Only datasets that were requested and fetched successfully appear as keys
+    in the result, so ``write_stock`` leaves the others untouched.
+    """
+    import pandas as pd
+    import yfinance as yf
 
-def fetch_single_stock(ticker: str) -> dict:
-    """Fetch all data for a single ticker and return as dict."""
     t = yf.Ticker(ticker)
+    result: dict = {"updated_at": datetime.now().isoformat()}
 
-    # Calendar
-    cal = t.calendar or {}
-    calendar_data = {
-        "dividend_date": cal.get("Dividend Date"),
-        "ex_dividend_date": cal.get("Ex-Dividend Date"),
-        "earnings_dates": cal.get("Earnings Date"),
-        "earnings_high": _nan_to_none(cal.get("Earnings High")),
-        "earnings_low": _nan_to_none(cal.get("Earnings Low")),
-        "earnings_average": _nan_to_none(cal.get("Earnings Average")),
-        "revenue_high": _nan_to_none(cal.get("Revenue High")),
-        "revenue_low": _nan_to_none(cal.get("Revenue Low")),
-        "revenue_average": _nan_to_none(cal.get("Revenue Average")),
-    }
-
-    # Earnings dates
-    earnings: list[dict] = []
-    try:
-        df = t.get_earnings_dates(limit=100)
-        if df is not None and not df.empty:
-            for dt_index, row in df.iterrows():
-                earnings.append({
-                    "date": cast(pd.Timestamp, dt_index).to_pydatetime(),
-                    "eps_estimate": _nan_to_none(row.get("EPS Estimate")),
-                    "reported_eps": _nan_to_none(row.get("Reported EPS")),
-                    "surprise_pct": _nan_to_none(row.get("Surprise(%)")),
-                })
-    except Exception:
-        log.warning("Failed to fetch earnings dates for %s", ticker, exc_info=True)
-
-    # Dividends
-    dividends: list[dict] = []
-    try:
-        s = t.dividends
-        if s is not None and not s.empty:
-            dividends = [
+    if "calendar" in datasets:
+        cal = t.calendar or {}
+        result["calendar"] = {
+            "dividend_date": cal.get("Dividend Date"),
+            "ex_dividend_date": cal.get("Ex-Dividend Date"),
+            "earnings_dates": cal.get("Earnings Date"),
+            "earnings_high": _nan_to_none(cal.get("Earnings High")),
+            "earnings_low": _nan_to_none(cal.get("Earnings Low")),
+            "earnings_average": _nan_to_none(cal.get("Earnings Average")),
+            "revenue_high": _nan_to_none(cal.get("Revenue High")),
+            "revenue_low": _nan_to_none(cal.get("Revenue Low")),
+            "revenue_average": _nan_to_none(cal.get("Revenue Average")),
+        }
+
+    if "earnings" in datasets:
+        try:
+            earnings: list[dict] = []
+            df = t.get_earnings_dates(limit=100)
+            if df is not None and not df.empty:
+                for dt_index, row in df.iterrows():
+                    earnings.append({
+                        "date": cast(pd.Timestamp, dt_index).to_pydatetime(),
+                        "eps_estimate": _nan_to_none(row.get("EPS Estimate")),
+                        "reported_eps": _nan_to_none(row.get("Reported EPS")),
+                        "surprise_pct": _nan_to_none(row.get("Surprise(%)")),
+                    })
+            result["earnings"] = earnings
+        except Exception as exc:
+            if is_throttle_error(exc):
+                raise
+            log.warning("Failed to fetch earnings dates for %s", ticker, exc_info=True)
+
+    if "dividends" in datasets:
+        try:
+            s = t.dividends
+            result["dividends"] = [
                 {"date": cast(pd.Timestamp, idx).date(), "amount": float(val)}
                 for idx, val in s.items()
-            ]
-    except Exception:
-        log.warning("Failed to fetch dividends for %s", ticker, exc_info=True)
+            ] if s is not None and not s.empty else []
+        except Exception as exc:
+            if is_throttle_error(exc):
+                raise
+            log.warning("Failed to fetch dividends for %s", ticker, exc_info=True)
 
-    # Splits
-    splits: list[dict] = []
-    try:
-        s = t.splits
-        if s is not None and not s.empty:
-            splits = [
-                {"date": cast(pd.Timestamp, idx).date(), "ratio": _ratio_str(float(val))}
+    if "splits" in datasets:
+        try:
+            s = t.splits
+            result["splits"] = [
+                {"date": cast(pd.Timestamp, idx).date(), "ratio": ratio_str(float(val))}
                 for idx, val in s.items()
-            ]
-    except Exception:
-        log.warning("Failed to fetch splits for %s", ticker, exc_info=True)
-
-    return {
-        "calendar": calendar_data,
-        "earnings": earnings,
-        "dividends": dividends,
-        "splits": splits,
-        "updated_at": datetime.now().isoformat(),
-    }
-
-
-async def sync_single_stock(ticker: str) -> None:
-    """Fetch and persist data for a single ticker."""
-    log.info("Syncing stock data for %s", ticker)
+            ] if s is not None and not s.empty else []
+        except Exception as exc:
+            if is_throttle_error(exc):
+                raise
+            log.warning("Failed to fetch splits for %s", ticker, exc_info=True)
+
+    return result
+
+
+async def fetch_stock(ticker: str, datasets: Collection[str] = STOCK_DATASETS) -> dict:
+    """Async counterpart of ``fetch_single_stock`` with the same result shape.
+
+    With ``YAHOO_CLIENT=native`` the calendar comes from quoteSummary,
+    earnings from the visualization endpoint and dividends and splits from a
+    single chart/events call, all decoded without pandas and fetched
+    concurrently.
+    """
+    if YAHOO_CLIENT != "native":
+        return await asyncio.to_thread(fetch_single_stock, ticker, datasets)
+
+    result: dict = {"updated_at": datetime.now().isoformat()}
+    wants_events = "dividends" in datasets or "splits" in datasets
+    calendar, events, earnings = await asyncio.gather(
+        yahoo_client.fetch_calendar(ticker) if "calendar" in datasets else _none(),
+        yahoo_client.fetch_events(ticker) if wants_events else _none(),
+        yahoo_client.fetch_earnings(ticker) if "earnings" in datasets else _none(),
+        return_exceptions=True,
+    )
+    # Same error contract as fetch_single_stock: throttling always propagates,
+    # a calendar failure fails the ticker, the others are logged and skipped.
+    for part in (calendar, events, earnings):
+        if isinstance(part, BaseException) and is_throttle_error(part):
+            raise part
+    if isinstance(calendar, BaseException):
+        raise calendar
+    if calendar is not None:
+        result["calendar"] = calendar
+    if isinstance(events, BaseException):
+        log.warning("Failed to fetch dividends/splits for %s", ticker, exc_info=events)
+    elif events is not None:
+        result.update({k: v for k, v in events.items() if k in datasets})
+    if isinstance(earnings, BaseException):
+        log.warning("Failed to fetch earnings dates for %s", ticker, exc_info=earnings)
+    elif earnings is not None:
+        result["earnings"] = earnings
+    return result
+
+
+async def _none() -> None:
+    return None
+
+
+def _upstream_calls(datasets: Collection[str]) -> int:
+    """How many upstream requests fetching *datasets* for one ticker makes."""
+    return len({_DATASET_CALLS.get(d, d) for d in datasets})
+
+
+async def _sync_ticker(
+    ticker: str, datasets: Collection[str], *, wait: bool = True, lane: Lane = "background",
+) -> tuple[SyncStatus, int, float, str | None]:
+    """Fetch and persist one ticker; return ``(status, rows, duration_ms, error)``."""
+    async with fetch_lanes.slot(lane):
+        return await _sync_ticker_in_slot(ticker, datasets, wait=wait, lane=lane)
+
+
+async def _sync_ticker_in_slot(
+    ticker: str, datasets: Collection[str], *, wait: bool, lane: Lane,
+) -> tuple[SyncStatus, int, float, str | None]:
+    paced = time.perf_counter()
+    acquired = await yahoo.acquire(_upstream_calls(datasets), wait=wait, lane=lane)
+    fetch_lanes.record_pacing(lane, (time.perf_counter() - paced) * 1000)
+    if not acquired:
+        log.info("Skipping %s: Yahoo circuit open", ticker)
+        return "throttled", 0, 0.0, "circuit open"
+    log.info("Syncing %s for %s", ", ".join(sorted(datasets)), ticker)
+    start = time.perf_counter()
+    try:
+        data = await fetch_stock(ticker, datasets)
+    except Exception as exc:
+        elapsed = (time.perf_counter() - start) * 1000
+        if is_throttle_error(exc):
+            yahoo.record_throttle()
+            log.warning("Yahoo throttled sync of %s: %s", ticker, exc)
+            return "throttled", 0, elapsed, repr(exc)
+        yahoo.record_failure()
+        log.error("Failed to fetch %s", ticker, exc_info=True)
+        return "failed", 0, elapsed, repr(exc)
+    yahoo.record_success()
+    # Storage errors are ours, not the upstream's: they never touch the governor.
     try:
-        data = await asyncio.to_thread(fetch_single_stock, ticker)
-        await write_stock(ticker, data)
-        log.info("Synced %s successfully", ticker)
-    except Exception:
-        log.error("Failed to sync %s", ticker, exc_info=True)
+        rows = await write_stock(ticker, data)
+    except Exception as exc:
+        log.error("Failed to store %s", ticker, exc_info=True)
+        return "failed", 0, (time.perf_counter() - start) * 1000, repr(exc)
+    log.info("Synced %s successfully", ticker)
+    return "ok", rows, (time.perf_counter() - start) * 1000, None
+
+
+async def sync_single_stock(
+    ticker: str,
+    datasets: Collection[str] = STOCK_DATASETS,
+    *,
+    wait: bool = True,
+    lane: Lane = "background",
+) -> SyncStatus:
+    """Fetch and persist data for a single ticker.
+
+    Upstream calls go through the shared Yahoo governor. With ``wait=False``
+    the call gives up immediately (returning ``"throttled"``) while the
+    circuit breaker is open instead of waiting for it to close. Pass
+    ``lane="interactive"`` when a user is waiting on the result.
+    """
+    status, _rows, _ms, _error = await _sync_ticker(ticker, datasets, wait=wait, lane=lane)
+    return status
 
 
 async def sync_all_stocks() -> None:
-    """Sync all tickers in the watchlist."""
-    tickers = await read_watchlist()
-    log.info("Starting stock sync for %d tickers", len(tickers))
-    for ticker in tickers:
-        await sync_single_stock(ticker)
-        await asyncio.sleep(2)
-    log.info("Stock sync complete")
+    """Refresh whichever datasets are due for each watchlist ticker.
+
+    Every run is recorded in the sync-run ledger with a checkpoint per ticker
+    and claimed by this process, which heartbeats while it works; a run owned
+    by another live process is left alone. If the previous run was
+    interrupted, its remaining tickers are finished first instead of
+    starting over. ``STOCK_SYNC_CONCURRENCY`` tickers are
+    in flight at once; pacing still comes from the Yahoo governor.
+    Throttled tickers are requeued at the back of the run (up to
+    ``_MAX_REQUEUES`` times); anything still not synced stays due and is
+    picked up by the next run.
+    """
+    if _sync_lock.locked():
+        log.info("Stock sync already running, skipping")
+        return
+    async with _sync_lock:
+        try:
+            run_id, remaining = await _claim_run()
+        except SyncRunBusy as exc:
+            log.info("Skipping stock sync: %s", exc)
+            return
+        if run_id is None:
+            log.info("No stock datasets due")
+            return
+
+        queue = deque(remaining)
+        counts = {"ok": 0, "throttled": 0, "failed": 0}
+        lost = False
+
+        async def worker() -> None:
+            nonlocal lost
+            while queue and not lost:
+                ticker, datasets, attempts = queue.popleft()
+                status, rows, duration_ms, error = await _sync_ticker(ticker, datasets)
+                attempts += 1
+                if not await write_sync_checkpoint(
+                    run_id, ticker, status, attempts, duration_ms, rows, error,
+                ):
+                    lost = True
+                    return
+                if status == "throttled" and attempts <= _MAX_REQUEUES:
+                    queue.append((ticker, datasets, attempts))
+                    continue
+                counts[status] += 1
+
+        async def heartbeat() -> None:
+            nonlocal lost
+            while not lost:
+                await asyncio.sleep(SYNC_RUN_LEASE_SECONDS / 3)
+                if not await heartbeat_sync_run(run_id):
+                    lost = True
+
+        beat = asyncio.create_task(heartbeat())
+        try:
+            # A failing worker cancels its siblings, and the group waits for
+            # them, so no worker outlives the sweep (and its claim on the run).
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(max(1, STOCK_SYNC_CONCURRENCY)):
+                    tg.create_task(worker())
+        except Exception as exc:
+            log.error("Sync run %d aborted; it resumes on the next sweep", run_id, exc_info=exc)
+            return
+        finally:
+            beat.cancel()
+        if lost:
+            log.warning("Sync run %d was taken over by another process; stopping", run_id)
+            return
+        await finish_sync_run(run_id)
+        log.info(
+            "Sync run %d complete: %d ok, %d failed, %d left throttled",
+            run_id, counts["ok"], counts["failed"], counts["throttled"],
+        )
+
+
+async def _claim_run() -> tuple[int | None, list[tuple[str, set[str], int]]]:
+    """Resume this process's claim on an unfinished run, or start a new one.
+
+    Returns ``(None, [])`` when nothing is due. Raises ``SyncRunBusy`` if
+    another live process owns a running run.
+    """
+    resumed = await resume_sync_run()
+    if resumed is not None and resumed[1]:
+        run_id, remaining = resumed
+        log.info("Resuming sync run %d with %d tickers left", run_id, len(remaining))
+        return run_id, remaining
+    if resumed is not None:
+        await finish_sync_run(resumed[0])
+    due = await read_due_datasets(STOCK_REFRESH_SECONDS)
+    if not due:
+        return None, []
+    run_id = await start_sync_run(due)
+    log.info("Starting sync run %d for %d tickers with due datasets", run_id, len(due))
+    return run_id, [(ticker, datasets, 0) for ticker, datasets in due.items()]
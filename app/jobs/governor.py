@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from app.config import (
+    YAHOO_BREAKER_COOLDOWN_SECONDS,
+    YAHOO_BREAKER_MAX_COOLDOWN_SECONDS,
+    YAHOO_BREAKER_THRESHOLD,
+    YAHOO_RATE_INITIAL,
+    YAHOO_RATE_MAX,
+    YAHOO_RATE_MIN,
+    YAHOO_RATE_STEP,
+)
+from app.jobs.lanes import LANES, Lane, PriorityLock
+
+log = logging.getLogger(__name__)
+
+# Matched against exception class names (anywhere in the MRO) so that
+# classification does not need to import yfinance, curl_cffi or httpx.
+_THROTTLE_CLASSES = frozenset({
+    "YFRateLimitError",
+    "Timeout",            # curl_cffi
+    "TimeoutException",   # httpx
+})
+_THROTTLE_STATUSES = frozenset({401, 429})
+
+
+def _http_status(exc: BaseException) -> int | None:
+    status = getattr(exc, "status", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """True if *exc* (or anything in its cause chain) is upstream throttling.
+
+    Decided by exception type and HTTP status only, never message text, and
+    meant for exceptions raised by an upstream call: wrap nothing else (the
+    database in particular) in the same ``try``.
+    """
+    seen: set[int] = set()
+    cur: BaseException | None = exc
+    while cur is not None and id(cur) not in seen:
+        seen.add(id(cur))
+        if isinstance(cur, TimeoutError) or any(
+            cls.__name__ in _THROTTLE_CLASSES for cls in type(cur).__mro__
+        ):
+            return True
+        if _http_status(cur) in _THROTTLE_STATUSES:
+            return True
+        cur = cur.__cause__ or cur.__context__
+    return False
+
+
+class UpstreamGovernor:
+    """Paces calls to one upstream and backs off when it pushes back.
+
+    ``rate`` is in requests per second: each success adds ``step``, each
+    throttle halves it. After ``breaker_threshold`` consecutive throttles the
+    breaker opens and every caller waits out the cooldown, which doubles each
+    time the first call after a cooldown is throttled again. Slots are
+    reserved under a short lock and waited for outside it; an interactive
+    reservation goes ahead of pending background ones, which are pushed back
+    by its cost.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial_rate: float,
+        min_rate: float,
+        max_rate: float,
+        step: float,
+        breaker_threshold: int,
+        cooldown: float,
+        max_cooldown: float,
+    ) -> None:
+        self.name = name
+        self.rate = initial_rate
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._step = step
+        self._breaker_threshold = breaker_threshold
+        self._base_cooldown = cooldown
+        self._cooldown = cooldown
+        self._max_cooldown = max_cooldown
+
+        self._lock = PriorityLock()
+        self._next_slot = 0.0    # tail of the background reservations
+        self._busy_until = 0.0   # end of the latest slot in use or reserved ahead
+        self._shift = 0.0        # total push-back applied to background reservations
+        self._waiting: dict[Lane, int] = {lane: 0 for lane in LANES}
+        self._open_until = 0.0
+        self._half_open = False
+        self._consecutive_throttles = 0
+        self.counters = {"ok": 0, "throttled": 0, "failed": 0, "breaker_opens": 0}
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    async def acquire(
+        self, cost: float = 1.0, *, wait: bool = True, lane: Lane = "background",
+    ) -> bool:
+        """Wait for a slot worth *cost* upstream requests.
+
+        The caller's own cost is charged after its slot, so it delays the
+        callers behind it, not itself. With ``wait=False`` returns False
+        immediately instead of waiting out an open breaker.
+        """
+        while True:
+            async with self._lock.hold(lane):
+                now = time.monotonic()
+                breaker_open = now < self._open_until
+                if breaker_open:
+                    if not wait:
+                        return False
+                    start = self._open_until
+                else:
+                    start, shift = self._reserve(cost, lane, now)
+            self._waiting[lane] += 1
+            try:
+                await asyncio.sleep(max(start - now, 0.0))
+                if breaker_open:
+                    continue
+                while lane == "background" and self._shift > shift:
+                    # an interactive caller went ahead of this reservation
+                    delay, shift = self._shift - shift, self._shift
+                    await asyncio.sleep(delay)
+            finally:
+                self._waiting[lane] -= 1
+            now = time.monotonic()
+            if now < self._open_until:
+                continue  # the breaker opened while we waited; reserve again
+            self._busy_until = max(self._busy_until, now + cost / self.rate)
+            return True
+
+    def _reserve(self, cost: float, lane: Lane, now: float) -> tuple[float, float]:
+        """Book a start time for *cost*; returns it with the current shift."""
+        span = cost / self.rate
+        if lane == "interactive":
+            start = max(now, self._busy_until)
+            self._busy_until = start + span
+            self._next_slot = max(self._next_slot, start) + span
+            self._shift += span
+            return start, self._shift
+        start = max(now, self._next_slot, self._busy_until)
+        self._next_slot = start + span
+        return start, self._shift
+
+    def record_success(self) -> None:
+        self.counters["ok"] += 1
+        self._consecutive_throttles = 0
+        if self._half_open:
+            self._half_open = False
+            self._cooldown = self._base_cooldown
+            log.info("%s upstream recovered, circuit closed", self.name)
+        self.rate = min(self._max_rate, self.rate + self._step)
+
+    def record_throttle(self) -> None:
+        self.counters["throttled"] += 1
+        self.rate = max(self._min_rate, self.rate / 2)
+        self._consecutive_throttles += 1
+        if self._half_open or self._consecutive_throttles >= self._breaker_threshold:
+            self._open(self._cooldown)
+            self._cooldown = min(self._cooldown * 2, self._max_cooldown)
+
+    def record_failure(self) -> None:
+        """A non-throttling error: counted, but does not change the rate."""
+        self.counters["failed"] += 1
+
+    def _open(self, seconds: float) -> None:
+        self._open_until = time.monotonic() + seconds
+        self._half_open = True
+        self._consecutive_throttles = 0
+        self.counters["breaker_opens"] += 1
+        log.warning("%s upstream throttling, circuit open for %.0fs", self.name, seconds)
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": round(self.rate, 4),
+            "circuit_open": self.is_open,
+            "open_for_seconds": round(max(self._open_until - time.monotonic(), 0.0), 1),
+            "waiting": dict(self._waiting),
+            **self.counters,
+        }
+
+
+yahoo = UpstreamGovernor(
+    "yahoo",
+    initial_rate=YAHOO_RATE_INITIAL,
+    min_rate=YAHOO_RATE_MIN,
+    max_rate=YAHOO_RATE_MAX,
+    step=YAHOO_RATE_STEP,
+    breaker_threshold=YAHOO_BREAKER_THRESHOLD,
+    cooldown=YAHOO_BREAKER_COOLDOWN_SECONDS,
+    max_cooldown=YAHOO_BREAKER_MAX_COOLDOWN_SECONDS,
+)
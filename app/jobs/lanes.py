@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Literal
+
+from app.config import FETCH_INTERACTIVE_RESERVED, FETCH_SLOTS
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+# Interactive: user-facing cold fetches and admin actions. Background: sweeps.
+# Order is priority order.
+Lane = Literal["interactive", "background"]
+LANES: tuple[Lane, ...] = ("interactive", "background")
+
+
+def _wake_first(waiters: deque[asyncio.Future]) -> bool:
+    while waiters:
+        fut = waiters.popleft()
+        if not fut.done():
+            fut.set_result(None)
+            return True
+    return False
+
+
+class PriorityLock:
+    """An asyncio lock that hands over to waiters in lane priority order.
+
+    FIFO within a lane. Ownership passes directly to the woken waiter, so a
+    newcomer cannot barge in between release and wake-up.
+    """
+
+    def __init__(self) -> None:
+        self._locked = False
+        self._waiters: dict[Lane, deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+
+    async def acquire(self, lane: Lane) -> None:
+        if not self._locked:
+            self._locked = True
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # ownership was handed to us; pass it on
+            else:
+                self._waiters[lane].remove(fut)
+            raise
+
+    def release(self) -> None:
+        if not any(_wake_first(self._waiters[lane]) for lane in LANES):
+            self._locked = False
+
+    @asynccontextmanager
+    async def hold(self, lane: Lane) -> AsyncIterator[None]:
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class FetchLanes:
+    """Concurrency slots for upstream fetches, split into priority lanes.
+
+    Any free slot goes to a waiting interactive fetch before a background one,
+    and background fetches may never hold the last ``reserved`` slots.
+    """
+
+    def __init__(self, slots: int, reserved: int) -> None:
+        self.slots = max(1, slots)
+        self.reserved = min(max(0, reserved), self.slots - 1)
+        self._running: dict[Lane, int] = dict.fromkeys(LANES, 0)
+        self._waiters: dict[Lane, deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._counters = {
+            lane: {"admitted": 0, "max_queued": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0,
+                   "pacing_ms_total": 0.0, "pacing_ms_max": 0.0}
+            for lane in LANES
+        }
+
+    def _has_room(self, lane: Lane) -> bool:
+        total = sum(self._running.values())
+        if lane == "background":
+            return total < self.slots - self.reserved and not any(
+                not f.done() for f in self._waiters["interactive"]
+            )
+        return total < self.slots
+
+    def _wake(self) -> None:
+        for lane in LANES:
+            while self._waiters[lane] and self._has_room(lane):
+                fut = self._waiters[lane].popleft()
+                if not fut.done():
+                    self._running[lane] += 1  # taken on behalf of the woken waiter
+                    fut.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane) -> AsyncIterator[None]:
+        """Hold one fetch slot in *lane* for the duration of the block."""
+        start = time.perf_counter()
+        if self._has_room(lane):
+            self._running[lane] += 1
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            waiters = self._waiters[lane]
+            waiters.append(fut)
+            counters = self._counters[lane]
+            counters["max_queued"] = max(counters["max_queued"], len(waiters))
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self._running[lane] -= 1
+                    self._wake()
+                else:
+                    waiters.remove(fut)
+                raise
+        self._record(lane, "wait", (time.perf_counter() - start) * 1000)
+        try:
+            yield
+        finally:
+            self._running[lane] -= 1
+            self._wake()
+
+    def record_pacing(self, lane: Lane, ms: float) -> None:
+        """Time a fetch in *lane* spent waiting on the upstream governor."""
+        self._record(lane, "pacing", ms, admitted=False)
+
+    def _record(self, lane: Lane, kind: str, ms: float, *, admitted: bool = True) -> None:
+        counters = self._counters[lane]
+        if admitted:
+            counters["admitted"] += 1
+        counters[f"{kind}_ms_total"] += ms
+        counters[f"{kind}_ms_max"] = max(counters[f"{kind}_ms_max"], ms)
+
+    def stats(self) -> dict:
+        lanes = {}
+        for lane in LANES:
+            c = self._counters[lane]
+            admitted = c["admitted"] or 1
+            lanes[lane] = {
+                "running": self._running[lane],
+                "queued": sum(not f.done() for f in self._waiters[lane]),
+                "max_queued": c["max_queued"],
+                "admitted": c["admitted"],
+                "wait_ms_avg": round(c["wait_ms_total"] / admitted, 1),
+                "wait_ms_max": round(c["wait_ms_max"], 1),
+                "pacing_ms_avg": round(c["pacing_ms_total"] / admitted, 1),
+                "pacing_ms_max": round(c["pacing_ms_max"], 1),
+            }
+        return {"slots": self.slots, "reserved_interactive": self.reserved, "lanes": lanes}
+
+
+fetch_lanes = FetchLanes(FETCH_SLOTS, FETCH_INTERACTIVE_RESERVED)
@@ -6,6 +6,8 @@ from zoneinfo import ZoneInfo
 from lxml import html
 from lxml.html import tostring
 
+from app.impacts import IMPACT_LABELS
+
 _CET = ZoneInfo("Europe/Berlin")
 
 
@@ -15,6 +17,7 @@ _IMPACT_MAP = {
     "yel": "Low",
     "gra": "Non-Economic",
 }
+assert set(_IMPACT_MAP.values()) == set(IMPACT_LABELS)
 
 
 def _text(el: html.HtmlElement | None) -> str | None:
@@ -7,10 +7,15 @@ from typing import TYPE_CHECKING
 
 from apscheduler import AsyncScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
+from app.config import CALENDAR_INDEX_REFRESH_SECONDS
 from app.database import close_db, init_db
-from app.jobs.fetch_calendars import sync_all_calendars
+from app.jobs.fetch_calendars import poll_release_windows, sync_all_calendars
+from app.jobs.fetch_prices import sync_price_bars
 from app.jobs.fetch_stock import sync_all_stocks
+from app.jobs.yahoo import yahoo_client
+from app.storage import load_calendar_index, maintain_calendar_partitions, refresh_calendar_index
 
 if TYPE_CHECKING:
     from collections.abc import AsyncIterator
@@ -31,14 +36,36 @@ async def lifespan(app: FastAPI) -> AsyncIterator[dict]:
         await scheduler.add_schedule(
             sync_all_calendars, CronTrigger(minute=0), id="sync_calendars"
         )
+        await scheduler.add_schedule(
+            sync_price_bars, CronTrigger(minute=30), id="sync_price_bars"
+        )
+        await scheduler.add_schedule(
+            poll_release_windows, IntervalTrigger(minutes=1), id="poll_release_windows"
+        )
+        await scheduler.add_schedule(
+            maintain_calendar_partitions,
+            CronTrigger(hour=3, minute=30),
+            id="maintain_calendar_partitions",
+        )
+        await scheduler.add_schedule(
+            load_calendar_index, CronTrigger(hour=3, minute=45), id="reload_calendar_index"
+        )
+        await scheduler.add_schedule(
+            refresh_calendar_index,
+            IntervalTrigger(seconds=CALENDAR_INDEX_REFRESH_SECONDS),
+            id="refresh_calendar_index",
+        )
 
         # Run initial sync in background so server starts immediately
+        await scheduler.add_job(load_calendar_index)
         await scheduler.add_job(sync_all_stocks)
         await scheduler.add_job(sync_all_calendars)
+        await scheduler.add_job(sync_price_bars)
 
         task = asyncio.create_task(scheduler.run_until_stopped())
         app.state.scheduler = scheduler
         yield {"scheduler": scheduler}
         task.cancel()
 
+    await yahoo_client.aclose()
     await close_db()
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from fractions import Fraction
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.config import YAHOO_HTTP_TIMEOUT, YAHOO_MAX_CONNECTIONS
+
+if TYPE_CHECKING:
+    import httpx
+
+log = logging.getLogger(__name__)
+
+_COOKIE_URL = "https://fc.yahoo.com"
+_QUERY_URL = "https://query2.finance.yahoo.com"
+_VISUALIZATION_URL = "https://query1.finance.yahoo.com/v1/finance/visualization"
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+)
+
+
+class YahooError(Exception):
+    """An upstream error. ``status`` is the HTTP status it stands for, which
+    ``governor.is_throttle_error`` uses to recognise throttling (429, and 401
+    when Yahoo keeps rejecting the crumb)."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _raw(val):
+    return val.get("raw") if isinstance(val, dict) else val
+
+
+def _epoch_date(val, tz: ZoneInfo | timezone = timezone.utc) -> date | None:
+    ts = _raw(val)
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, tz).date()
+
+
+def ratio_str(value: float) -> str:
+    """Render a split factor as ``"numerator:denominator"``."""
+    frac = Fraction(value).limit_denominator(1000)
+    return f"{frac.numerator}:{frac.denominator}"
+
+
+class YahooClient:
+    """Async Yahoo Finance JSON client sharing one connection pool and crumb.
+
+    Decodes responses straight into the records ``write_stock`` expects, with
+    no pandas in between, so many tickers can be fetched concurrently on the
+    event loop.
+    """
+
+    def __init__(self) -> None:
+        self._client: httpx.AsyncClient | None = None
+        self._crumb: str | None = None
+        self._crumb_lock = asyncio.Lock()
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": _USER_AGENT},
+                timeout=YAHOO_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=YAHOO_MAX_CONNECTIONS,
+                    max_keepalive_connections=YAHOO_MAX_CONNECTIONS,
+                ),
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._crumb = None
+
+    async def _refresh_crumb(self, stale: str | None) -> str:
+        async with self._crumb_lock:
+            # Another request may have refreshed it while we waited.
+            if self._crumb is not None and self._crumb != stale:
+                return self._crumb
+            http = self._http()
+            await http.get(_COOKIE_URL)  # sets the session cookie; status is irrelevant
+            r = await http.get(f"{_QUERY_URL}/v1/test/getcrumb")
+            if r.status_code == 429:
+                raise YahooError("Too many requests while fetching crumb", 429)
+            crumb = r.text.strip()
+            if r.status_code != 200 or not crumb or "<" in crumb:
+                raise YahooError(f"Invalid crumb response (HTTP {r.status_code})", 401)
+            self._crumb = crumb
+            log.info("Refreshed Yahoo crumb")
+            return crumb
+
+    async def _get_json(self, endpoint: str, path: str, params: dict) -> dict:
+        return await self._request_json(endpoint, f"{_QUERY_URL}{path}", params)
+
+    async def _request_json(
+        self, endpoint: str, url: str, params: dict, body: dict | None = None,
+    ) -> dict:
+        """GET *url*, or POST *body* to it, with the crumb; one retry on a stale crumb."""
+        crumb = self._crumb or await self._refresh_crumb(None)
+        for attempt in range(2):
+            if body is None:
+                r = await self._http().get(url, params={**params, "crumb": crumb})
+            else:
+                r = await self._http().post(url, params={**params, "crumb": crumb}, json=body)
+            if r.status_code == 429:
+                raise YahooError(f"Too many requests to {endpoint}", 429)
+            if r.status_code in (401, 403) or "Invalid Crumb" in r.text[:200]:
+                if attempt == 0:
+                    crumb = await self._refresh_crumb(crumb)
+                    continue
+                raise YahooError(f"Crumb rejected by {endpoint} (HTTP {r.status_code})", 401)
+            if r.status_code != 200:
+                raise YahooError(f"HTTP {r.status_code} from {endpoint}", r.status_code)
+            return r.json()
+        raise AssertionError("unreachable")
+
+    async def quote_summary(self, ticker: str, modules: list[str]) -> dict:
+        data = await self._get_json(
+            "quoteSummary",
+            f"/v10/finance/quoteSummary/{ticker}",
+            {"modules": ",".join(modules), "formatted": "false"},
+        )
+        result = (data.get("quoteSummary") or {}).get("result") or []
+        if not result:
+            error = (data.get("quoteSummary") or {}).get("error") or {}
+            raise YahooError(f"Empty quoteSummary result: {error.get('code')}")
+        return result[0]
+
+    async def fetch_calendar(self, ticker: str) -> dict:
+        """The ``calendar`` dataset, from the quoteSummary calendarEvents module."""
+        events = (await self.quote_summary(ticker, ["calendarEvents"])).get("calendarEvents") or {}
+        earnings = events.get("earnings") or {}
+        earnings_dates = [
+            d for d in (_epoch_date(v) for v in earnings.get("earningsDate") or []) if d
+        ]
+        return {
+            "dividend_date": _epoch_date(events.get("dividendDate")),
+            "ex_dividend_date": _epoch_date(events.get("exDividendDate")),
+            "earnings_dates": earnings_dates or None,
+            "earnings_high": _raw(earnings.get("earningsHigh")),
+            "earnings_low": _raw(earnings.get("earningsLow")),
+            "earnings_average": _raw(earnings.get("earningsAverage")),
+            "revenue_high": _raw(earnings.get("revenueHigh")),
+            "revenue_low": _raw(earnings.get("revenueLow")),
+            "revenue_average": _raw(earnings.get("revenueAverage")),
+        }
+
+    async def fetch_earnings(self, ticker: str, limit: int = 100) -> list[dict]:
+        """The ``earnings`` dataset: past and upcoming reports, newest first.
+
+        Queries the same ``sp_earnings`` visualization entity as the market
+        earnings calendar, narrowed to one ticker. Dates are UTC instants;
+        Yahoo sends 0 for a missing EPS figure, which becomes None as in
+        yfinance.
+        """
+        data = await self._request_json(
+            "visualization",
+            _VISUALIZATION_URL,
+            {"lang": "en-US", "region": "US"},
+            {
+                "size": min(limit, 100),
+                "offset": 0,
+                "sortField": "startdatetime",
+                "sortType": "DESC",
+                "entityIdType": "sp_earnings",
+                "includeFields": ["startdatetime", "epsestimate", "epsactual", "epssurprisepct"],
+                "query": {
+                    "operator": "and",
+                    "operands": [
+                        {"operator": "eq", "operands": ["ticker", ticker]},
+                        {"operator": "or", "operands": [
+                            {"operator": "eq", "operands": ["eventtype", "EAD"]},
+                            {"operator": "eq", "operands": ["eventtype", "ERA"]},
+                        ]},
+                    ],
+                },
+            },
+        )
+        finance = data.get("finance") or {}
+        if finance.get("error"):
+            raise YahooError(f"Visualization error: {finance['error']}")
+        documents = ((finance.get("result") or [{}])[0] or {}).get("documents") or []
+        if not documents:
+            return []
+        columns = [col.get("label") for col in documents[0].get("columns") or []]
+
+        earnings: list[dict] = []
+        for row in documents[0].get("rows") or []:
+            rec = dict(zip(columns, row))
+            try:
+                dt = datetime.fromisoformat(rec["Event Start Date"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            earnings.append({
+                "date": dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc),
+                "eps_estimate": rec.get("EPS Estimate") or None,
+                "reported_eps": rec.get("Reported EPS") or None,
+                "surprise_pct": rec.get("Surprise (%)") or None,
+            })
+        return earnings
+
+    async def fetch_events(self, ticker: str) -> dict[str, list[dict]]:
+        """The ``dividends`` and ``splits`` datasets from one chart/events call.
+
+        A coarse interval keeps the price payload tiny; events are returned
+        for the full range regardless. Dates are taken in the exchange's
+        timezone, as yfinance does.
+        """
+        data = await self._get_json(
+            "chart",
+            f"/v8/finance/chart/{ticker}",
+            {"range": "max", "interval": "3mo", "events": "div,split"},
+        )
+        result = (data.get("chart") or {}).get("result") or []
+        if not result:
+            raise YahooError("Empty chart result")
+        chart = result[0]
+        try:
+            tz: ZoneInfo | timezone = ZoneInfo(chart.get("meta", {}).get("exchangeTimezoneName") or "UTC")
+        except (ZoneInfoNotFoundError, ValueError):
+            tz = timezone.utc
+        events = chart.get("events") or {}
+
+        dividends = sorted(
+            (
+                {"date": _epoch_date(ev["date"], tz), "amount": float(ev["amount"])}
+                for ev in (events.get("dividends") or {}).values()
+            ),
+            key=lambda d: d["date"],
+        )
+        splits = sorted(
+            (
+                {
+                    "date": _epoch_date(ev["date"], tz),
+                    "ratio": ratio_str(ev["numerator"] / ev["denominator"]),
+                }
+                for ev in (events.get("splits") or {}).values()
+                if ev.get("denominator")
+            ),
+            key=lambda s: s["date"],
+        )
+        return {"dividends": dividends, "splits": splits}
+
+
+yahoo_client = YahooClient()
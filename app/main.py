@@ -5,12 +5,18 @@ from fastapi import FastAPI
 
 from app.jobs.scheduler import lifespan
 from app.routes.admin import router as admin_router
+from app.routes.analytics import router as analytics_router
 from app.routes.calendars import router as calendars_router
+from app.routes.changes import router as changes_router
 from app.routes.stocks import router as stocks_router
+from app.timing import ServerTimingMiddleware
 
 app = FastAPI(title="kitsune-finance", lifespan=lifespan)
+app.add_middleware(ServerTimingMiddleware)
 app.include_router(stocks_router)
 app.include_router(calendars_router)
+app.include_router(changes_router)
+app.include_router(analytics_router)
 app.include_router(admin_router)
 
 if __name__ == "__main__":
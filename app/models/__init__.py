@@ -1,17 +1,23 @@
 from app.models.schemas import (
     DividendRecord,
+    DividendStats,
     EarningsCalendarItem,
     EarningsDate,
+    EarningsSurpriseStats,
     EconomicsCalendarItem,
+    PriceBar,
     SplitRecord,
     StockCalendar,
 )
 
 __all__ = [
     "DividendRecord",
+    "DividendStats",
     "EarningsCalendarItem",
     "EarningsDate",
+    "EarningsSurpriseStats",
     "EconomicsCalendarItem",
+    "PriceBar",
     "SplitRecord",
     "StockCalendar",
 ]
@@ -37,6 +37,40 @@ class SplitRecord(BaseModel):
     ratio: str  # e.g. "4:1"
 
 
+class PriceBar(BaseModel):
+    ts: datetime
+    open: float | None = None
+    high: float | None = None
+    low: float | None = None
+    close: float | None = None
+    adj_close: float | None = None
+    volume: int | None = None
+
+
+# --- Aggregates over stored stock histories ---
+
+
+class EarningsSurpriseStats(BaseModel):
+    ticker: str
+    quarters: int
+    last_reported: datetime
+    surprise_mean: float | None = None
+    surprise_median: float | None = None
+    surprise_stddev: float | None = None
+    hit_rate: float | None = None
+
+
+class DividendStats(BaseModel):
+    ticker: str
+    last_amount: float | None = None
+    last_date: date
+    ttm: float | None = None
+    payments_ttm: int
+    cagr: float | None = None
+    last_close: float | None = None
+    yield_ttm: float | None = None
+
+
 # --- Market-wide calendar models (from yf.Calendars) ---
 
 
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+
+def _frame_label(code, lineno: int) -> str:
+    return f"{code.co_name} ({code.co_filename}:{lineno})"
+
+
+def sample_stacks(
+    seconds: float,
+    interval: float,
+    thread_ids: set[int] | None = None,
+    top: int = 30,
+) -> dict:
+    """Sample Python stacks of the running process for *seconds*.
+
+    Blocking — run it in a worker thread. Samples every thread in
+    *thread_ids* (all other threads when None) every *interval* seconds and
+    aggregates self time per line, inclusive time per function, and the most
+    frequent collapsed stacks.
+    """
+    own = threading.get_ident()
+    self_hits: Counter[str] = Counter()
+    total_hits: Counter[str] = Counter()
+    stacks: Counter[str] = Counter()
+    samples = 0
+
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for tid, frame in sys._current_frames().items():
+            if tid == own or (thread_ids is not None and tid not in thread_ids):
+                continue
+            samples += 1
+            self_hits[_frame_label(frame.f_code, frame.f_lineno)] += 1
+            names = []
+            seen = set()
+            f = frame
+            while f is not None:
+                code = f.f_code
+                names.append(code.co_name)
+                func = _frame_label(code, code.co_firstlineno)
+                if func not in seen:
+                    seen.add(func)
+                    total_hits[func] += 1
+                f = f.f_back
+            stacks[";".join(reversed(names))] += 1
+        time.sleep(interval)
+
+    def _ranked(counter: Counter[str]) -> list[dict]:
+        return [
+            {"frame": label, "samples": n, "pct": round(100 * n / samples, 2)}
+            for label, n in counter.most_common(top)
+        ]
+
+    return {
+        "samples": samples,
+        "seconds": seconds,
+        "interval_ms": interval * 1000,
+        "self": _ranked(self_hits),
+        "inclusive": _ranked(total_hits),
+        "stacks": [{"stack": s, "samples": n} for s, n in stacks.most_common(top)],
+    }
+
+
+def profile(
+    seconds: float,
+    interval: float,
+    thread_ids: set[int] | None = None,
+    trace_memory: bool = False,
+    top: int = 30,
+) -> dict:
+    """Stack sampling plus, optionally, a tracemalloc diff over the same window."""
+    started_tracing = False
+    before = None
+    if trace_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            started_tracing = True
+        before = tracemalloc.take_snapshot()
+
+    report = sample_stacks(seconds, interval, thread_ids, top)
+
+    if before is not None:
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        report["memory"] = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "growth": [
+                {
+                    "location": str(stat.traceback[0]),
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in after.compare_to(before, "lineno")[:top]
+            ],
+        }
+        if started_tracing:
+            tracemalloc.stop()
+    return report
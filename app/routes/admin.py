@@ -1,14 +1,41 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import asyncio
+import threading
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
+from app import profiling
+from app.database import pool_stats
 from app.jobs.fetch_calendars import sync_all_calendars
+from app.jobs.fetch_prices import sync_price_bars
 from app.jobs.fetch_stock import sync_all_stocks, sync_single_stock
-from app.storage import add_to_watchlist, read_watchlist, remove_from_watchlist
+from app.jobs.governor import yahoo
+from app.jobs.lanes import fetch_lanes
+from app.storage import (
+    SNAPSHOT_TABLES,
+    SnapshotError,
+    add_to_watchlist,
+    calendar_index,
+    export_snapshot,
+    import_snapshot,
+    list_snapshots,
+    maintain_calendar_partitions,
+    read_failing_tickers,
+    read_slowest_tickers,
+    read_sync_run_tickers,
+    read_sync_runs,
+    read_watchlist,
+    remove_from_watchlist,
+    snapshot_path,
+)
 
 router = APIRouter(prefix="/admin")
 
+_profile_lock = asyncio.Lock()
+
 
 class AddTickersRequest(BaseModel):
     tickers: list[str]
@@ -23,18 +50,120 @@ async def get_watchlist() -> list[str]:
 async def add_tickers(req: AddTickersRequest) -> list[str]:
     for ticker in req.tickers:
         await add_to_watchlist(ticker)
-        await sync_single_stock(ticker.upper())
-    return await read_watchlist()
+        await sync_single_stock(ticker.upper(), wait=False, lane="interactive")
+    return await read_watchlist(primary=True)
 
 
 @router.delete("/watchlist/{ticker}")
 async def remove_ticker(ticker: str) -> list[str]:
     await remove_from_watchlist(ticker)
-    return await read_watchlist()
+    return await read_watchlist(primary=True)
 
 
 @router.post("/sync")
 async def trigger_sync() -> dict:
     await sync_all_stocks()
     await sync_all_calendars()
+    await sync_price_bars()
     return {"status": "ok"}
+
+
+@router.get("/sync/runs")
+async def get_sync_runs(limit: int = Query(20, ge=1, le=200)) -> list[dict]:
+    return await read_sync_runs(limit)
+
+
+@router.get("/sync/runs/{run_id}")
+async def get_sync_run(run_id: int) -> list[dict]:
+    tickers = await read_sync_run_tickers(run_id)
+    if not tickers:
+        raise HTTPException(status_code=404, detail=f"No sync run {run_id}")
+    return tickers
+
+
+@router.get("/sync/slowest")
+async def get_slowest_tickers(
+    days: int = Query(7, ge=1, le=90), limit: int = Query(20, ge=1, le=200),
+) -> list[dict]:
+    return await read_slowest_tickers(days, limit)
+
+
+@router.get("/sync/failing")
+async def get_failing_tickers(
+    days: int = Query(7, ge=1, le=90), limit: int = Query(20, ge=1, le=200),
+) -> list[dict]:
+    return await read_failing_tickers(days, limit)
+
+
+@router.get("/db/pools")
+async def get_pool_stats() -> dict:
+    return pool_stats()
+
+
+@router.post("/partitions/maintain")
+async def trigger_partition_maintenance() -> dict:
+    return await maintain_calendar_partitions()
+
+
+@router.get("/upstream")
+async def get_upstream_stats() -> dict:
+    return {"yahoo": yahoo.stats(), "fetch_lanes": fetch_lanes.stats()}
+
+
+@router.get("/calendar-index")
+async def get_calendar_index_stats() -> dict:
+    return calendar_index.stats()
+
+
+@router.post("/profile")
+async def run_profile(
+    seconds: float = Query(5.0, gt=0, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    all_threads: bool = Query(False, description="Sample worker threads, not just the event loop"),
+    tracemalloc: bool = Query(False, description="Include a tracemalloc growth diff"),
+    top: int = Query(30, ge=1, le=200),
+) -> dict:
+    """Sample the live process for a bounded time and return the report."""
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with _profile_lock:
+        loop_thread = None if all_threads else {threading.get_ident()}
+        return await asyncio.to_thread(
+            profiling.profile, seconds, interval_ms / 1000, loop_thread, tracemalloc, top,
+        )
+
+
+@router.get("/snapshots")
+async def get_snapshots() -> list[dict]:
+    return list_snapshots()
+
+
+@router.post("/snapshots")
+async def create_snapshot(name: str | None = None) -> dict:
+    try:
+        return await export_snapshot(name)
+    except FileExistsError:
+        raise HTTPException(status_code=409, detail=f"Snapshot {name} already exists")
+    except SnapshotError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.post("/snapshots/{name}/import")
+async def restore_snapshot(name: str) -> dict:
+    try:
+        return await import_snapshot(name)
+    except SnapshotError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/snapshots/{name}/{table}.parquet")
+async def download_snapshot_table(name: str, table: str) -> FileResponse:
+    if table not in SNAPSHOT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table {table}")
+    try:
+        path = snapshot_path(name) / f"{table}.parquet"
+    except SnapshotError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"No {table} in snapshot {name}")
+    return FileResponse(path, media_type="application/vnd.apache.parquet", filename=path.name)
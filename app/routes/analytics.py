@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Query
+
+from app.models import DividendStats, EarningsSurpriseStats
+from app.storage import read_dividend_stats, read_earnings_surprise_stats
+from app.timing import phase
+
+router = APIRouter(prefix="/analytics")
+
+
+@router.get("/earnings-surprise", response_model=list[EarningsSurpriseStats])
+async def get_earnings_surprise(
+    ticker: list[str] | None = Query(None, description="Only these tickers (default: watchlist)"),
+    quarters: int = Query(8, ge=1, le=100, description="Most recent reported quarters per ticker"),
+):
+    stats = await read_earnings_surprise_stats(ticker, quarters)
+    with phase("validate"):
+        return [EarningsSurpriseStats(**s) for s in stats]
+
+
+@router.get("/dividends", response_model=list[DividendStats])
+async def get_dividend_stats(
+    ticker: list[str] | None = Query(None, description="Only these tickers (default: watchlist)"),
+    years: int = Query(5, ge=1, le=30, description="CAGR horizon in years"),
+):
+    stats = await read_dividend_stats(ticker, years)
+    with phase("validate"):
+        return [DividendStats(**s) for s in stats]
@@ -1,39 +1,107 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import date
+from typing import TYPE_CHECKING
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
+from app.config import CALENDAR_RENDER_IN_DB
+from app.events import CALENDAR_KINDS, calendar_events
 from app.models import EarningsCalendarItem, EconomicsCalendarItem
-from app.storage import read_earnings_calendar, read_economics_calendar
+from app.storage import (
+    calendar_index,
+    read_earnings_calendar,
+    read_earnings_calendar_json,
+    read_economics_calendar,
+    read_economics_calendar_json,
+)
+from app.timing import phase
 
 router = APIRouter(prefix="/calendar")
 
 _DAY_FMT = "%A, %m/%d/%Y"
+_HEARTBEAT_SECONDS = 15.0
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
 
 
 @router.get("/earnings", response_model=dict[str, dict[str, list[EarningsCalendarItem]]])
 async def get_earnings_calendar(
     start: date | None = Query(None, description="Start date YYYY-MM-DD"),
     end: date | None = Query(None, description="End date YYYY-MM-DD"),
+    symbol: list[str] | None = Query(None, description="Only these symbols"),
 ):
-    data = await read_earnings_calendar(start=start, end=end)
-    return {
-        day.strftime(_DAY_FMT): {
-            company: [EarningsCalendarItem(**i) for i in items]
-            for company, items in companies.items()
+    if CALENDAR_RENDER_IN_DB and not calendar_index.covers(start):
+        body = await read_earnings_calendar_json(start=start, end=end, symbols=symbol)
+        return Response(body, media_type="application/json")
+    data = await read_earnings_calendar(start=start, end=end, symbols=symbol)
+    with phase("validate"):
+        return {
+            day.strftime(_DAY_FMT): {
+                company: [EarningsCalendarItem(**i) for i in items]
+                for company, items in companies.items()
+            }
+            for day, companies in data.items()
         }
-        for day, companies in data.items()
-    }
 
 
 @router.get("/economics", response_model=dict[str, list[EconomicsCalendarItem]])
 async def get_economics_calendar(
     start: date | None = Query(None, description="Start date YYYY-MM-DD"),
     end: date | None = Query(None, description="End date YYYY-MM-DD"),
+    currency: list[str] | None = Query(None, description="Only these currencies, e.g. USD"),
+    impact: list[str] | None = Query(None, description="Only these impact levels, e.g. High"),
 ):
-    data = await read_economics_calendar(start=start, end=end)
-    return {
-        day.strftime(_DAY_FMT): [EconomicsCalendarItem(**e) for e in events]
-        for day, events in data.items()
-    }
+    if CALENDAR_RENDER_IN_DB and not calendar_index.covers(start):
+        body = await read_economics_calendar_json(
+            start=start, end=end, currencies=currency, impacts=impact,
+        )
+        return Response(body, media_type="application/json")
+    data = await read_economics_calendar(
+        start=start, end=end, currencies=currency, impacts=impact,
+    )
+    with phase("validate"):
+        return {
+            day.strftime(_DAY_FMT): [EconomicsCalendarItem(**e) for e in events]
+            for day, events in data.items()
+        }
+
+
+@router.get("/stream")
+async def stream_calendar_updates(
+    request: Request,
+    types: list[str] = Query(list(CALENDAR_KINDS), description="economics and/or earnings"),
+    currency: list[str] | None = Query(None, description="Economics currency filter, e.g. USD"),
+    impact: list[str] | None = Query(None, description="Economics impact filter, e.g. High"),
+    symbol: list[str] | None = Query(None, description="Earnings symbol filter"),
+):
+    """Server-sent events carrying calendar rows as they are inserted or changed."""
+    unknown = set(types) - set(CALENDAR_KINDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown types: {sorted(unknown)}")
+    sub = calendar_events.subscribe(types, currency, impact, symbol)
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            yield b": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), _HEARTBEAT_SECONDS)
+                except TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if frame is None:
+                    yield b"event: overflow\ndata: {}\n\n"
+                    return
+                yield frame
+        finally:
+            calendar_events.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.storage import CHANGE_TYPES, ChangeFeedError, read_changes
+
+router = APIRouter()
+
+
+@router.get("/changes")
+async def get_changes(
+    since: str | None = Query(None, description="Cursor from a previous response"),
+    types: list[str] | None = Query(None, description=f"Any of: {', '.join(CHANGE_TYPES)}"),
+    limit: int = Query(1000, ge=1, le=10000),
+) -> dict:
+    """Rows inserted or updated since the cursor, plus the cursor to resume from."""
+    try:
+        return await read_changes(since, types, limit)
+    except ChangeFeedError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
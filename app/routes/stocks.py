@@ -1,33 +1,57 @@
 from __future__ import annotations
 
+from datetime import date
+from typing import TYPE_CHECKING, TypeVar
+
 from fastapi import APIRouter, HTTPException, Query
 
+from app.config import PRICE_BAR_INTERVALS
 from app.jobs.fetch_stock import sync_single_stock
-from app.models import DividendRecord, EarningsDate, SplitRecord, StockCalendar
-from app.storage import add_to_watchlist, read_stock
+from app.models import DividendRecord, EarningsDate, PriceBar, SplitRecord, StockCalendar
+from app.storage import (
+    add_to_watchlist,
+    has_stock,
+    read_price_bars,
+    read_stock_calendar,
+    read_stock_dividends,
+    read_stock_earnings,
+    read_stock_splits,
+)
+from app.timing import phase
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
 
 router = APIRouter(prefix="/stocks")
 
+T = TypeVar("T")
+
+
+async def _load_stock(ticker: str, read: Callable[[bool], Awaitable[T]]) -> T:
+    """Run one dataset reader, auto-fetching the ticker if not yet cached.
 
-async def _load_stock(ticker: str) -> dict:
-    """Load stock data from DB, auto-fetching if not yet cached."""
-    data = await read_stock(ticker)
-    if data is None:
-        await add_to_watchlist(ticker)
-        await sync_single_stock(ticker)
-        data = await read_stock(ticker)
-    if not isinstance(data, dict):
+    *read* takes a ``primary`` flag. An empty result only triggers the
+    existence check, so the common case is a single narrow query. After a
+    cold fetch both checks read the primary, which the sync just wrote to.
+    """
+    data = await read(False)
+    if data or await has_stock(ticker):
+        return data
+    await add_to_watchlist(ticker)
+    with phase("upstream"):
+        await sync_single_stock(ticker, wait=False, lane="interactive")
+    if not await has_stock(ticker, primary=True):
         raise HTTPException(status_code=502, detail=f"Failed to fetch data for {ticker}")
-    return data
+    return await read(True)
 
 
 @router.get("/{ticker}/calendar", response_model=StockCalendar)
 async def get_stock_calendar(ticker: str):
-    data = await _load_stock(ticker)
-    cal = data.get("calendar")
+    cal = await _load_stock(ticker, lambda primary: read_stock_calendar(ticker, primary=primary))
     if not cal:
         raise HTTPException(status_code=404, detail=f"No calendar data for {ticker}")
-    return StockCalendar(**cal)
+    with phase("validate"):
+        return StockCalendar(**cal)
 
 
 @router.get("/{ticker}/earnings", response_model=list[EarningsDate])
@@ -35,19 +59,63 @@ async def get_stock_earnings(
     ticker: str,
     limit: int = Query(12, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    start: date | None = Query(None, description="Start date YYYY-MM-DD"),
+    end: date | None = Query(None, description="End date YYYY-MM-DD"),
 ):
-    data = await _load_stock(ticker)
-    earnings = data.get("earnings", [])
-    return [EarningsDate(**e) for e in earnings[offset : offset + limit]]
+    earnings = await _load_stock(
+        ticker,
+        lambda primary: read_stock_earnings(ticker, limit, offset, start, end, primary=primary),
+    )
+    with phase("validate"):
+        return [EarningsDate(**e) for e in earnings]
 
 
 @router.get("/{ticker}/dividends", response_model=list[DividendRecord])
-async def get_stock_dividends(ticker: str):
-    data = await _load_stock(ticker)
-    return [DividendRecord(**d) for d in data.get("dividends", [])]
+async def get_stock_dividends(
+    ticker: str,
+    limit: int | None = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    start: date | None = Query(None, description="Start date YYYY-MM-DD"),
+    end: date | None = Query(None, description="End date YYYY-MM-DD"),
+):
+    dividends = await _load_stock(
+        ticker,
+        lambda primary: read_stock_dividends(ticker, limit, offset, start, end, primary=primary),
+    )
+    with phase("validate"):
+        return [DividendRecord(**d) for d in dividends]
 
 
 @router.get("/{ticker}/splits", response_model=list[SplitRecord])
-async def get_stock_splits(ticker: str):
-    data = await _load_stock(ticker)
-    return [SplitRecord(**s) for s in data.get("splits", [])]
+async def get_stock_splits(
+    ticker: str,
+    limit: int | None = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    start: date | None = Query(None, description="Start date YYYY-MM-DD"),
+    end: date | None = Query(None, description="End date YYYY-MM-DD"),
+):
+    splits = await _load_stock(
+        ticker,
+        lambda primary: read_stock_splits(ticker, limit, offset, start, end, primary=primary),
+    )
+    with phase("validate"):
+        return [SplitRecord(**s) for s in splits]
+
+
+@router.get("/{ticker}/bars", response_model=list[PriceBar])
+async def get_stock_bars(
+    ticker: str,
+    interval: str = Query("1d", description="Bar interval, e.g. 1d or 1h"),
+    start: date | None = Query(None, description="Start date YYYY-MM-DD"),
+    end: date | None = Query(None, description="End date YYYY-MM-DD"),
+    limit: int | None = Query(None, ge=1, le=100000, description="Only the newest N bars"),
+):
+    """Stored price bars, oldest first. Bars are ingested for watchlist tickers only."""
+    if interval not in PRICE_BAR_INTERVALS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Interval {interval!r} is not ingested; available: {', '.join(PRICE_BAR_INTERVALS)}",
+        )
+    bars = await read_price_bars(ticker, interval, start, end, limit)
+    with phase("validate"):
+        return [PriceBar(**b) for b in bars]
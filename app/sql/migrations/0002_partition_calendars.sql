@@ -0,0 +1,115 @@
+-- Month-partitioned calendar tables.
+--
+-- Both calendar tables are converted to RANGE partitions on `date`, one
+-- partition per UTC month. Partitions are created on demand by
+-- ensure_calendar_partitions(), which the write path and the daily
+-- maintenance job call; old partitions are detached or dropped by retention.
+
+CREATE OR REPLACE FUNCTION ensure_calendar_partitions(
+    parent TEXT, from_ts TIMESTAMPTZ, to_ts TIMESTAMPTZ
+) RETURNS void LANGUAGE plpgsql AS $$
+DECLARE
+    month_start DATE := date_trunc('month', from_ts AT TIME ZONE 'UTC')::date;
+    last_month  DATE := date_trunc('month', to_ts AT TIME ZONE 'UTC')::date;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        IF to_regclass(format('%I', parent || to_char(month_start, '"_y"YYYY"m"MM'))) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                parent || to_char(month_start, '"_y"YYYY"m"MM'),
+                parent,
+                month_start::timestamp AT TIME ZONE 'UTC',
+                (month_start + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+        END IF;
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$;
+
+-- earnings_calendar
+
+ALTER TABLE earnings_calendar RENAME TO earnings_calendar_legacy;
+ALTER INDEX earnings_calendar_pkey RENAME TO earnings_calendar_legacy_pkey;
+ALTER INDEX earnings_calendar_symbol_date_key RENAME TO earnings_calendar_legacy_symbol_date_key;
+ALTER SEQUENCE earnings_calendar_id_seq RENAME TO earnings_calendar_legacy_id_seq;
+
+CREATE TABLE earnings_calendar (
+    id            SERIAL,
+    company       TEXT,
+    symbol        TEXT NOT NULL,
+    marketcap     DOUBLE PRECISION,
+    event_name    TEXT,
+    date          TIMESTAMPTZ NOT NULL,
+    timing        TEXT,
+    eps_estimate  DOUBLE PRECISION,
+    reported_eps  DOUBLE PRECISION,
+    surprise_pct  DOUBLE PRECISION,
+    PRIMARY KEY (id, date),
+    UNIQUE (symbol, date)
+) PARTITION BY RANGE (date);
+
+CREATE INDEX earnings_calendar_date_idx ON earnings_calendar (date);
+
+SELECT ensure_calendar_partitions(
+    'earnings_calendar',
+    coalesce(min(date), now()),
+    greatest(max(date), now()) + INTERVAL '3 months'
+) FROM earnings_calendar_legacy;
+
+INSERT INTO earnings_calendar
+    (id, company, symbol, marketcap, event_name, date, timing,
+     eps_estimate, reported_eps, surprise_pct)
+SELECT id, company, symbol, marketcap, event_name, date, timing,
+       eps_estimate, reported_eps, surprise_pct
+FROM earnings_calendar_legacy
+WHERE date IS NOT NULL;
+
+SELECT setval(
+    pg_get_serial_sequence('earnings_calendar', 'id'),
+    coalesce((SELECT max(id) FROM earnings_calendar), 0) + 1,
+    false
+);
+
+DROP TABLE earnings_calendar_legacy;
+
+-- economics_calendar
+
+ALTER TABLE economics_calendar RENAME TO economics_calendar_legacy;
+ALTER INDEX economics_calendar_pkey RENAME TO economics_calendar_legacy_pkey;
+ALTER INDEX economics_calendar_date_event_key RENAME TO economics_calendar_legacy_date_event_key;
+ALTER SEQUENCE economics_calendar_id_seq RENAME TO economics_calendar_legacy_id_seq;
+
+CREATE TABLE economics_calendar (
+    id          SERIAL,
+    date        TIMESTAMPTZ NOT NULL,
+    is_all_day  BOOLEAN NOT NULL DEFAULT FALSE,
+    currency    TEXT,
+    impact      TEXT,
+    event       TEXT NOT NULL,
+    actual      TEXT,
+    forecast    TEXT,
+    previous    TEXT,
+    PRIMARY KEY (id, date),
+    UNIQUE (date, event)
+) PARTITION BY RANGE (date);
+
+SELECT ensure_calendar_partitions(
+    'economics_calendar',
+    coalesce(min(date), now()),
+    greatest(max(date), now()) + INTERVAL '3 months'
+) FROM economics_calendar_legacy;
+
+INSERT INTO economics_calendar
+    (id, date, is_all_day, currency, impact, event, actual, forecast, previous)
+SELECT id, date, is_all_day, currency, impact, event, actual, forecast, previous
+FROM economics_calendar_legacy
+WHERE date IS NOT NULL;
+
+SELECT setval(
+    pg_get_serial_sequence('economics_calendar', 'id'),
+    coalesce((SELECT max(id) FROM economics_calendar), 0) + 1,
+    false
+);
+
+DROP TABLE economics_calendar_legacy;
@@ -0,0 +1,9 @@
+-- Last successful upstream fetch per ticker and dataset
+-- (calendar, earnings, dividends, splits), used to schedule refreshes.
+
+CREATE TABLE IF NOT EXISTS stock_fetch_state (
+    ticker      TEXT NOT NULL,
+    dataset     TEXT NOT NULL,
+    fetched_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (ticker, dataset)
+);
@@ -0,0 +1,27 @@
+-- Ledger of stock sync runs with a per-ticker checkpoint, so an interrupted
+-- run can resume where it stopped and slow or failing tickers are visible.
+
+CREATE TABLE IF NOT EXISTS sync_runs (
+    id           SERIAL PRIMARY KEY,
+    started_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at  TIMESTAMPTZ,
+    status       TEXT NOT NULL DEFAULT 'running',  -- running | completed | interrupted
+    total        INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS sync_run_tickers (
+    run_id        INTEGER NOT NULL REFERENCES sync_runs (id) ON DELETE CASCADE,
+    ticker        TEXT NOT NULL,
+    position      INTEGER NOT NULL,
+    datasets      TEXT[] NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',  -- pending | ok | throttled | failed
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    finished_at   TIMESTAMPTZ,
+    duration_ms   DOUBLE PRECISION,
+    rows_written  INTEGER,
+    error         TEXT,
+    PRIMARY KEY (run_id, ticker)
+);
+
+CREATE INDEX IF NOT EXISTS sync_run_tickers_ticker_idx
+    ON sync_run_tickers (ticker, finished_at DESC);
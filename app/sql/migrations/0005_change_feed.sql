@@ -0,0 +1,51 @@
+-- Change feed stamps.
+--
+-- Every insert, and every update that actually changes a row, stamps it with
+-- the writing transaction's id (change_xid) and a global sequence number
+-- (change_seq). Readers page through (change_xid, change_seq) and stop at the
+-- oldest still-running transaction, so a row that commits late is never
+-- skipped by a cursor that has already moved past its sequence number.
+-- Updates that only touch updated_at (the unconditional stock upserts) keep
+-- their old stamps.
+
+CREATE SEQUENCE IF NOT EXISTS change_seq;
+
+CREATE OR REPLACE FUNCTION stamp_change() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND to_jsonb(NEW) - 'updated_at' = to_jsonb(OLD) - 'updated_at' THEN
+        RETURN NEW;
+    END IF;
+    NEW.change_xid := pg_current_xact_id()::text::bigint;
+    NEW.change_seq := nextval('change_seq');
+    RETURN NEW;
+END;
+$$;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'stock_calendar', 'stock_earnings', 'stock_dividends', 'stock_splits',
+        'earnings_calendar', 'economics_calendar'
+    ] LOOP
+        EXECUTE format(
+            'ALTER TABLE %I ADD COLUMN IF NOT EXISTS change_xid BIGINT, '
+            'ADD COLUMN IF NOT EXISTS change_seq BIGINT', t
+        );
+        -- Existing rows all land in this migration's transaction.
+        EXECUTE format(
+            'UPDATE %I SET change_xid = pg_current_xact_id()::text::bigint, '
+            'change_seq = nextval(''change_seq'') WHERE change_seq IS NULL', t
+        );
+        EXECUTE format(
+            'CREATE OR REPLACE TRIGGER %I BEFORE INSERT OR UPDATE ON %I '
+            'FOR EACH ROW EXECUTE FUNCTION stamp_change()', t || '_stamp_change', t
+        );
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS %I ON %I (change_xid, change_seq)', t || '_change_idx', t
+        );
+    END LOOP;
+END;
+$$;
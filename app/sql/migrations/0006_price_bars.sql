@@ -0,0 +1,18 @@
+-- OHLCV price bars for watchlist tickers, one row per (ticker, bar_interval, ts).
+--
+-- Month RANGE partitions on ts, created on demand through
+-- ensure_calendar_partitions() like the calendar tables. Prices are stored as
+-- REAL to keep rows narrow; they are quotes, not accounting values.
+
+CREATE TABLE IF NOT EXISTS price_bars (
+    ticker       TEXT NOT NULL,
+    bar_interval TEXT NOT NULL,
+    ts           TIMESTAMPTZ NOT NULL,
+    open         REAL,
+    high         REAL,
+    low          REAL,
+    close        REAL,
+    adj_close    REAL,
+    volume       BIGINT,
+    PRIMARY KEY (ticker, bar_interval, ts)
+) PARTITION BY RANGE (ts);
@@ -0,0 +1,7 @@
+-- Sync-run ownership: the process executing a run claims it and refreshes
+-- heartbeat_at while it works. Another process only resumes a run whose
+-- heartbeat is older than the lease (its owner died).
+
+ALTER TABLE sync_runs
+    ADD COLUMN IF NOT EXISTS owner TEXT,
+    ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ;
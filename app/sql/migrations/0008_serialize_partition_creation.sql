@@ -0,0 +1,37 @@
+-- Serialize on-demand partition creation.
+--
+-- ensure_calendar_partitions() checked to_regclass() and then ran CREATE TABLE
+-- with nothing in between, so two processes creating the same new month at
+-- once made the loser fail with "relation already exists". A missing
+-- partition is now created under a per-parent transaction advisory lock and
+-- re-checked once the lock is held; the common case, where every partition
+-- exists, still takes no lock.
+
+CREATE OR REPLACE FUNCTION ensure_calendar_partitions(
+    parent TEXT, from_ts TIMESTAMPTZ, to_ts TIMESTAMPTZ
+) RETURNS void LANGUAGE plpgsql AS $$
+DECLARE
+    month_start DATE := date_trunc('month', from_ts AT TIME ZONE 'UTC')::date;
+    last_month  DATE := date_trunc('month', to_ts AT TIME ZONE 'UTC')::date;
+    locked      BOOLEAN := FALSE;
+    part        TEXT;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        part := parent || to_char(month_start, '"_y"YYYY"m"MM');
+        IF to_regclass(format('%I', part)) IS NULL THEN
+            IF NOT locked THEN
+                PERFORM pg_advisory_xact_lock(hashtext('calendar_partitions:' || parent));
+                locked := TRUE;
+            END IF;
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                part,
+                parent,
+                month_start::timestamp AT TIME ZONE 'UTC',
+                (month_start + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+        END IF;
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+END;
+$$;
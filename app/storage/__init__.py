@@ -1,23 +1,98 @@
+from app.storage.analytics import read_dividend_stats, read_earnings_surprise_stats
+from app.storage.calendar_index import calendar_index
+from app.storage.changes import CHANGE_TYPES, ChangeFeedError, read_changes
+from app.storage.partitions import maintain_calendar_partitions
+from app.storage.price_bars import read_price_bar_cursors, read_price_bars, write_price_bars
 from app.storage.queries import (
     add_to_watchlist,
+    has_stock,
+    load_calendar_index,
+    read_due_datasets,
     read_earnings_calendar,
+    read_earnings_calendar_json,
     read_economics_calendar,
+    read_economics_calendar_json,
     read_stock,
+    read_stock_calendar,
+    read_stock_dividends,
+    read_stock_earnings,
+    read_stock_splits,
+    read_upcoming_releases,
     read_watchlist,
+    refresh_calendar_index,
     remove_from_watchlist,
     write_earnings_calendar,
+    write_earnings_calendar_rows,
     write_economics_calendar,
     write_stock,
 )
+from app.storage.snapshots import (
+    SNAPSHOT_TABLES,
+    SnapshotError,
+    export_snapshot,
+    import_snapshot,
+    list_snapshots,
+    snapshot_path,
+)
+from app.storage.sync_runs import (
+    SyncRunBusy,
+    finish_sync_run,
+    heartbeat_sync_run,
+    read_failing_tickers,
+    read_slowest_tickers,
+    read_sync_run_tickers,
+    read_sync_runs,
+    resume_sync_run,
+    start_sync_run,
+    write_sync_checkpoint,
+)
 
 __all__ = [
+    "CHANGE_TYPES",
+    "ChangeFeedError",
+    "SNAPSHOT_TABLES",
+    "SnapshotError",
+    "SyncRunBusy",
     "add_to_watchlist",
+    "calendar_index",
+    "export_snapshot",
+    "finish_sync_run",
+    "has_stock",
+    "heartbeat_sync_run",
+    "import_snapshot",
+    "list_snapshots",
+    "load_calendar_index",
+    "maintain_calendar_partitions",
+    "read_changes",
+    "read_dividend_stats",
+    "read_due_datasets",
     "read_earnings_calendar",
+    "read_earnings_calendar_json",
+    "read_earnings_surprise_stats",
     "read_economics_calendar",
+    "read_economics_calendar_json",
+    "read_failing_tickers",
+    "read_price_bar_cursors",
+    "read_price_bars",
+    "read_slowest_tickers",
     "read_stock",
+    "read_stock_calendar",
+    "read_stock_dividends",
+    "read_stock_earnings",
+    "read_stock_splits",
+    "read_sync_run_tickers",
+    "read_sync_runs",
+    "read_upcoming_releases",
     "read_watchlist",
+    "refresh_calendar_index",
     "remove_from_watchlist",
+    "resume_sync_run",
+    "snapshot_path",
+    "start_sync_run",
     "write_earnings_calendar",
+    "write_earnings_calendar_rows",
     "write_economics_calendar",
+    "write_price_bars",
     "write_stock",
+    "write_sync_checkpoint",
 ]
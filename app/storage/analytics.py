@@ -0,0 +1,101 @@
+"""Aggregate statistics computed in SQL over the stored per-ticker histories.
+
+Each function answers for many tickers in one statement, returning one compact
+row per ticker instead of the raw history. ``tickers=None`` means the whole
+watchlist.
+"""
+from __future__ import annotations
+
+import app.database as db
+
+_TICKERS = "coalesce($1::text[], ARRAY(SELECT ticker FROM watchlist))"
+
+
+def _upper(tickers: list[str] | None) -> list[str] | None:
+    return [t.upper() for t in tickers] if tickers else None
+
+
+async def read_earnings_surprise_stats(
+    tickers: list[str] | None = None, quarters: int = 8,
+) -> list[dict]:
+    """Surprise mean/median/stddev and beat rate over each ticker's last *quarters* reports.
+
+    Only reported quarters count; ``hit_rate`` is the share that beat the
+    estimate, among those that had one.
+    """
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            f"""
+            WITH reported AS (
+                SELECT ticker, date, eps_estimate, reported_eps, surprise_pct,
+                       row_number() OVER (PARTITION BY ticker ORDER BY date DESC) AS n
+                FROM stock_earnings
+                WHERE ticker = ANY({_TICKERS}) AND reported_eps IS NOT NULL
+            )
+            SELECT ticker,
+                   count(*) AS quarters,
+                   max(date) AS last_reported,
+                   avg(surprise_pct) AS surprise_mean,
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY surprise_pct) AS surprise_median,
+                   stddev_samp(surprise_pct) AS surprise_stddev,
+                   avg((reported_eps > eps_estimate)::int)
+                       FILTER (WHERE eps_estimate IS NOT NULL) AS hit_rate
+            FROM reported
+            WHERE n <= $2
+            GROUP BY ticker
+            ORDER BY ticker
+            """,
+            _upper(tickers), quarters,
+        )
+    return [{**dict(r), "last_reported": r["last_reported"].isoformat()} for r in rows]
+
+
+async def read_dividend_stats(
+    tickers: list[str] | None = None, years: int = 5,
+) -> list[dict]:
+    """Trailing-twelve-month dividends, their CAGR over *years*, and yield.
+
+    ``cagr`` compares the latest TTM sum with the TTM sum *years* earlier.
+    ``yield_ttm`` divides the TTM sum by the latest stored daily close and is
+    null for tickers without daily price bars.
+    """
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            f"""
+            WITH divs AS (
+                SELECT ticker, date, amount,
+                       first_value(amount) OVER w AS last_amount,
+                       first_value(date) OVER w AS last_date
+                FROM stock_dividends
+                WHERE ticker = ANY({_TICKERS})
+                WINDOW w AS (PARTITION BY ticker ORDER BY date DESC)
+            ),
+            per_ticker AS (
+                SELECT ticker,
+                       max(last_amount) AS last_amount,
+                       max(last_date) AS last_date,
+                       sum(amount) FILTER (WHERE date > current_date - interval '1 year') AS ttm,
+                       count(*) FILTER (WHERE date > current_date - interval '1 year') AS payments_ttm,
+                       sum(amount) FILTER (
+                           WHERE date > current_date - make_interval(years => $2::int + 1)
+                             AND date <= current_date - make_interval(years => $2::int)
+                       ) AS ttm_base
+                FROM divs
+                GROUP BY ticker
+            )
+            SELECT p.ticker, p.last_amount, p.last_date, p.ttm, p.payments_ttm,
+                   CASE WHEN p.ttm_base > 0 AND p.ttm > 0
+                        THEN power(p.ttm / p.ttm_base, 1.0 / $2::int) - 1 END AS cagr,
+                   bar.close AS last_close,
+                   CASE WHEN bar.close > 0 THEN p.ttm / bar.close END AS yield_ttm
+            FROM per_ticker p
+            LEFT JOIN LATERAL (
+                SELECT close FROM price_bars
+                WHERE ticker = p.ticker AND bar_interval = '1d'
+                ORDER BY ts DESC LIMIT 1
+            ) bar ON true
+            ORDER BY p.ticker
+            """,
+            _upper(tickers), years,
+        )
+    return [{**dict(r), "last_date": r["last_date"].isoformat()} for r in rows]
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable, Mapping
+
+log = logging.getLogger(__name__)
+
+
+class EarningsRow:
+    __slots__ = (
+        "id", "day", "company", "symbol", "marketcap", "event_name", "date",
+        "timing", "eps_estimate", "reported_eps", "surprise_pct",
+    )
+
+    def __init__(self, r: Mapping) -> None:
+        self.id = r["id"]
+        self.day = r["date"].date()
+        self.company = r["company"] or r["symbol"]
+        self.symbol = r["symbol"]
+        self.marketcap = r["marketcap"]
+        self.event_name = r["event_name"]
+        self.date = r["date"]
+        self.timing = r["timing"]
+        self.eps_estimate = r["eps_estimate"]
+        self.reported_eps = r["reported_eps"]
+        self.surprise_pct = r["surprise_pct"]
+
+    @property
+    def sort_key(self) -> tuple:
+        # Matches ``ORDER BY <UTC day>, id``; days are reversed on output.
+        return (self.day.toordinal(), self.id)
+
+    def to_item(self) -> dict:
+        return {
+            "symbol": self.symbol,
+            "marketcap": self.marketcap,
+            "event_name": self.event_name,
+            "date": self.date.isoformat(),
+            "timing": self.timing,
+            "eps_estimate": self.eps_estimate,
+            "reported_eps": self.reported_eps,
+            "surprise_pct": self.surprise_pct,
+        }
+
+
+class EconomicsRow:
+    __slots__ = (
+        "id", "day", "date", "is_all_day", "currency", "impact", "event",
+        "actual", "forecast", "previous",
+    )
+
+    def __init__(self, r: Mapping) -> None:
+        self.id = r["id"]
+        self.day = r["date"].date()
+        self.date = r["date"]
+        self.is_all_day = r["is_all_day"]
+        self.currency = r["currency"]
+        self.impact = r["impact"]
+        self.event = r["event"]
+        self.actual = r["actual"]
+        self.forecast = r["forecast"]
+        self.previous = r["previous"]
+
+    @property
+    def sort_key(self) -> tuple:
+        # Matches ``ORDER BY <UTC day>, is_all_day DESC, date, id``.
+        return (self.day.toordinal(), not self.is_all_day, self.date.timestamp(), self.id)
+
+    def to_item(self) -> dict:
+        return {
+            "date": self.date.isoformat(),
+            "is_all_day": self.is_all_day,
+            "currency": self.currency,
+            "impact": self.impact,
+            "event": self.event,
+            "actual": self.actual,
+            "forecast": self.forecast,
+            "previous": self.previous,
+        }
+
+
+class _SortedRows:
+    """Rows kept sorted by ``sort_key`` in parallel lists for bisect lookups."""
+
+    __slots__ = ("_keys", "_rows", "_key_by_id")
+
+    def __init__(self) -> None:
+        self._keys: list[tuple] = []
+        self._rows: list = []
+        self._key_by_id: dict[int, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def upsert(self, row) -> None:
+        old = self._key_by_id.get(row.id)
+        if old is not None:
+            i = bisect_left(self._keys, old)
+            del self._keys[i]
+            del self._rows[i]
+        key = row.sort_key
+        i = bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self._rows.insert(i, row)
+        self._key_by_id[row.id] = key
+
+    def between(self, start: date | None, end: date | None) -> list:
+        lo = bisect_left(self._keys, (start.toordinal(),)) if start else 0
+        hi = bisect_left(self._keys, (end.toordinal() + 1,)) if end else len(self._keys)
+        return self._rows[lo:hi]
+
+
+class CalendarIndex:
+    """In-process copy of recent and upcoming calendar rows.
+
+    Covers every row dated on or after ``covered_from``; reads whose
+    ``start`` falls inside that range are answered here, anything older goes
+    to the database. Local writers apply their changed rows through
+    ``apply_*`` straight away; rows written by other processes arrive from
+    the change feed, read from ``cursor`` onwards.
+    """
+
+    def __init__(self) -> None:
+        self.covered_from: date | None = None
+        # Change-feed cursor up to which the index reflects the database.
+        self.cursor: str | None = None
+        self._earnings = _SortedRows()
+        self._economics = _SortedRows()
+        # Rows applied while a reload is reading the DB, replayed on top of it.
+        self._replay: list[tuple[str, Mapping]] | None = None
+
+    def covers(self, start: date | None) -> bool:
+        return self.covered_from is not None and start is not None and start >= self.covered_from
+
+    def begin_reload(self) -> None:
+        self._replay = []
+
+    def abort_reload(self) -> None:
+        self._replay = None
+
+    def reset(
+        self,
+        covered_from: date,
+        cursor: str,
+        earnings: Iterable[Mapping],
+        economics: Iterable[Mapping],
+    ) -> None:
+        replay, self._replay = self._replay or [], None
+        self.covered_from = covered_from
+        self.cursor = cursor
+        self._earnings = _SortedRows()
+        self._economics = _SortedRows()
+        self.apply_earnings(earnings)
+        self.apply_economics(economics)
+        for kind, r in replay:
+            (self.apply_earnings if kind == "earnings" else self.apply_economics)([r])
+        log.info(
+            "Calendar index loaded: %d earnings, %d economics rows from %s",
+            len(self._earnings), len(self._economics), covered_from,
+        )
+
+    def apply_earnings(self, rows: Iterable[Mapping]) -> None:
+        self._apply("earnings", EarningsRow, self._earnings, rows)
+
+    def apply_economics(self, rows: Iterable[Mapping]) -> None:
+        self._apply("economics", EconomicsRow, self._economics, rows)
+
+    def _apply(self, kind: str, row_cls: type, target: _SortedRows, rows: Iterable[Mapping]) -> None:
+        for r in rows:
+            if self._replay is not None:
+                self._replay.append((kind, r))
+            if self.covered_from is None or r["date"].date() < self.covered_from:
+                continue
+            target.upsert(row_cls(r))
+
+    def earnings(
+        self, start: date | None, end: date | None, symbols: Collection[str] | None = None,
+    ) -> dict[date, dict[str, list[dict]]]:
+        by_day: dict[date, dict[str, list[dict]]] = {}
+        for row in self._earnings.between(start, end):
+            if symbols is not None and row.symbol not in symbols:
+                continue
+            by_day.setdefault(row.day, {}).setdefault(row.company, []).append(row.to_item())
+        return dict(reversed(by_day.items()))
+
+    def economics(
+        self,
+        start: date | None,
+        end: date | None,
+        currencies: Collection[str] | None = None,
+        impacts: Collection[str] | None = None,
+    ) -> dict[date, list[dict]]:
+        by_day: dict[date, list[dict]] = {}
+        for row in self._economics.between(start, end):
+            if currencies is not None and row.currency not in currencies:
+                continue
+            if impacts is not None and row.impact not in impacts:
+                continue
+            by_day.setdefault(row.day, []).append(row.to_item())
+        return by_day
+
+    def stats(self) -> dict:
+        return {
+            "covered_from": self.covered_from.isoformat() if self.covered_from else None,
+            "cursor": self.cursor,
+            "earnings_rows": len(self._earnings),
+            "economics_rows": len(self._economics),
+        }
+
+
+def index_start(past_days: int) -> date:
+    return (datetime.now(timezone.utc) - timedelta(days=past_days)).date()
+
+
+calendar_index = CalendarIndex()
@@ -0,0 +1,104 @@
+"""Incremental change feed over the stamped data tables.
+
+Rows carry ``(change_xid, change_seq)`` stamps (see migration 0005). A cursor
+is the last stamp a consumer has seen, rendered as ``"<xid>-<seq>"``. Reads
+are capped at the oldest in-flight transaction, so everything before the
+returned cursor is final and no late commit can appear behind it.
+"""
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import app.database as db
+
+if TYPE_CHECKING:
+    import asyncpg
+
+# Feed types are table names; rows come back with every column but the stamps.
+CHANGE_TYPES = (
+    "stock_calendar",
+    "stock_earnings",
+    "stock_dividends",
+    "stock_splits",
+    "earnings_calendar",
+    "economics_calendar",
+)
+
+
+class ChangeFeedError(ValueError):
+    pass
+
+
+def parse_cursor(cursor: str | None) -> tuple[int, int]:
+    if not cursor:
+        return 0, 0
+    try:
+        xid, seq = (int(part) for part in cursor.split("-"))
+    except ValueError:
+        raise ChangeFeedError(f"Invalid cursor: {cursor!r}") from None
+    if xid < 0 or seq < 0:
+        raise ChangeFeedError(f"Invalid cursor: {cursor!r}")
+    return xid, seq
+
+
+def format_cursor(xid: int, seq: int = 0) -> str:
+    return f"{xid}-{seq}"
+
+
+async def read_change_horizon(conn: asyncpg.Connection) -> int:
+    """Oldest transaction still running, as seen by *conn*'s snapshot.
+
+    Every change not visible in that snapshot has a ``change_xid`` at or
+    above it, so ``format_cursor(horizon)`` resumes exactly after the snapshot.
+    """
+    return await conn.fetchval("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+async def read_changes(
+    since: str | None = None,
+    types: list[str] | None = None,
+    limit: int = 1000,
+    *,
+    primary: bool = False,
+) -> dict:
+    """Rows inserted or changed after *since*, oldest first, and the next cursor.
+
+    ``has_more`` is set when the page is full; pass ``next_cursor`` back to
+    continue. Deletes (watchlist removal, retention) are not reported.
+    """
+    xid, seq = parse_cursor(since)
+    selected = types or list(CHANGE_TYPES)
+    unknown = [t for t in selected if t not in CHANGE_TYPES]
+    if unknown:
+        raise ChangeFeedError(f"Unknown change types: {', '.join(unknown)}")
+
+    parts = [
+        f"""(SELECT '{name}' AS type, change_xid, change_seq,
+                    (to_jsonb(t) - 'change_xid' - 'change_seq')::text AS row
+             FROM {name} t
+             WHERE (change_xid, change_seq) > ($1, $2) AND change_xid < $3
+             ORDER BY change_xid, change_seq
+             LIMIT $4)"""
+        for name in dict.fromkeys(selected)
+    ]
+    sql = " UNION ALL ".join(parts) + " ORDER BY change_xid, change_seq LIMIT $4"
+
+    async with db.reader_conn(primary) as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            horizon = await read_change_horizon(conn)
+            rows = await conn.fetch(sql, xid, seq, horizon, limit)
+
+    changes = [
+        {"type": r["type"], "seq": r["change_seq"], "row": json.loads(r["row"])}
+        for r in rows
+    ]
+    has_more = len(rows) == limit
+    if has_more:
+        next_cursor = format_cursor(rows[-1]["change_xid"], rows[-1]["change_seq"])
+    elif (horizon, 0) > (xid, seq):
+        # Every transaction below the horizon has finished: skip straight to it.
+        next_cursor = format_cursor(horizon, 0)
+    else:
+        next_cursor = format_cursor(xid, seq)
+    return {"changes": changes, "next_cursor": next_cursor, "has_more": has_more}
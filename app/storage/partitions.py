@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING
+
+import app.database as db
+from app.config import (
+    CALENDAR_ARCHIVE_SCHEMA,
+    CALENDAR_PARTITION_PREMAKE_MONTHS,
+    CALENDAR_RETENTION_MODE,
+    CALENDAR_RETENTION_MONTHS,
+)
+
+if TYPE_CHECKING:
+    import asyncpg
+
+log = logging.getLogger(__name__)
+
+CALENDAR_TABLES = ("earnings_calendar", "economics_calendar")
+
+_PARTITION_RE = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+async def ensure_partitions(
+    conn: asyncpg.Connection, table: str, dates: list[datetime],
+) -> None:
+    """Create any missing monthly partitions of *table* covering *dates*.
+
+    Call this outside the write transaction: creating a partition locks the
+    parent table, and the common case (all partitions exist) takes no lock.
+    """
+    if not dates:
+        return
+    await conn.execute(
+        "SELECT ensure_calendar_partitions($1, min(d), max(d)) "
+        "FROM unnest($2::timestamptz[]) AS d",
+        table, dates,
+    )
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def _list_partitions(conn: asyncpg.Connection, table: str) -> list[tuple[str, date]]:
+    rows = await conn.fetch(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = $1
+        """,
+        table,
+    )
+    result = []
+    for r in rows:
+        m = _PARTITION_RE.search(r["relname"])
+        if m:
+            result.append((r["relname"], date(int(m.group(1)), int(m.group(2)), 1)))
+    return sorted(result, key=lambda p: p[1])
+
+
+async def maintain_calendar_partitions() -> dict[str, dict[str, list[str]]]:
+    """Pre-create upcoming partitions and apply the retention policy.
+
+    Returns ``{table: {"created": [...], "retired": [...]}}``.
+    """
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    horizon = _add_months(this_month, CALENDAR_PARTITION_PREMAKE_MONTHS)
+    cutoff = (
+        _add_months(this_month, -CALENDAR_RETENTION_MONTHS)
+        if CALENDAR_RETENTION_MONTHS > 0 else None
+    )
+
+    summary: dict[str, dict[str, list[str]]] = {}
+    async with db.write_conn() as conn:
+        for table in CALENDAR_TABLES:
+            before = {name for name, _ in await _list_partitions(conn, table)}
+            await conn.execute(
+                "SELECT ensure_calendar_partitions($1, $2, $3)",
+                table,
+                datetime.combine(this_month, datetime.min.time(), timezone.utc),
+                datetime.combine(horizon, datetime.min.time(), timezone.utc),
+            )
+            partitions = await _list_partitions(conn, table)
+            created = [name for name, _ in partitions if name not in before]
+
+            retired: list[str] = []
+            if cutoff is not None:
+                for name, month in partitions:
+                    if month >= cutoff:
+                        break
+                    await _retire_partition(conn, table, name)
+                    retired.append(name)
+
+            summary[table] = {"created": created, "retired": retired}
+            if created or retired:
+                log.info(
+                    "Partitions for %s: created %d, retired %d (%s)",
+                    table, len(created), len(retired), CALENDAR_RETENTION_MODE,
+                )
+    return summary
+
+
+async def _retire_partition(conn: asyncpg.Connection, table: str, name: str) -> None:
+    async with conn.transaction():
+        if CALENDAR_RETENTION_MODE == "drop":
+            await conn.execute(f'DROP TABLE "{name}"')
+            return
+        await conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{CALENDAR_ARCHIVE_SCHEMA}"')
+        await conn.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+        await conn.execute(f'ALTER TABLE "{name}" SET SCHEMA "{CALENDAR_ARCHIVE_SCHEMA}"')
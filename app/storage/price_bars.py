@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import app.database as db
+from app.storage.partitions import ensure_partitions
+
+PRICE_BAR_COLUMNS = (
+    "ticker", "bar_interval", "ts", "open", "high", "low", "close", "adj_close", "volume",
+)
+
+
+async def read_price_bar_cursors(interval: str) -> dict[str, datetime | None]:
+    """Return ``{ticker: last stored bar}`` for every watchlist ticker.
+
+    Tickers without bars map to None. One index probe per ticker.
+    """
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT w.ticker, last.ts
+            FROM watchlist w
+            LEFT JOIN LATERAL (
+                SELECT ts FROM price_bars
+                WHERE ticker = w.ticker AND bar_interval = $1
+                ORDER BY ts DESC LIMIT 1
+            ) last ON true
+            """,
+            interval,
+        )
+    return {r["ticker"]: r["ts"] for r in rows}
+
+
+async def write_price_bars(records: list[tuple]) -> int:
+    """Bulk-load bars given as tuples in ``PRICE_BAR_COLUMNS`` order.
+
+    Rows are COPYed into a temporary staging table and merged in one
+    statement, so re-fetched bars (the still-forming latest one) are updated
+    in place. Returns the number of rows inserted or changed.
+    """
+    if not records:
+        return 0
+    async with db.write_conn() as conn:
+        await ensure_partitions(conn, "price_bars", [r[2] for r in records])
+        async with conn.transaction():
+            await conn.execute(
+                "CREATE TEMP TABLE price_bars_stage "
+                "(LIKE price_bars INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            await conn.copy_records_to_table(
+                "price_bars_stage", records=records, columns=PRICE_BAR_COLUMNS,
+            )
+            status = await conn.execute(
+                """
+                INSERT INTO price_bars
+                SELECT DISTINCT ON (ticker, bar_interval, ts) * FROM price_bars_stage
+                ON CONFLICT (ticker, bar_interval, ts) DO UPDATE SET
+                    open = EXCLUDED.open,
+                    high = EXCLUDED.high,
+                    low = EXCLUDED.low,
+                    close = EXCLUDED.close,
+                    adj_close = EXCLUDED.adj_close,
+                    volume = EXCLUDED.volume
+                WHERE (price_bars.open, price_bars.high, price_bars.low, price_bars.close,
+                       price_bars.adj_close, price_bars.volume)
+                    IS DISTINCT FROM
+                      (EXCLUDED.open, EXCLUDED.high, EXCLUDED.low, EXCLUDED.close,
+                       EXCLUDED.adj_close, EXCLUDED.volume)
+                """
+            )
+    return int(status.split()[-1])
+
+
+async def read_price_bars(
+    ticker: str,
+    interval: str = "1d",
+    start: date | None = None,
+    end: date | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    """Oldest-first bars in ``[start, end]`` (UTC days); the newest *limit* if set."""
+    clauses = ["ticker = $1", "bar_interval = $2"]
+    args: list = [ticker.upper(), interval]
+    if start:
+        args.append(start)
+        clauses.append(f"ts >= ${len(args)}::date::timestamptz")
+    if end:
+        args.append(end)
+        clauses.append(f"ts < (${len(args)}::date + 1)::timestamptz")
+    args.append(limit)
+    sql = (
+        "SELECT * FROM (SELECT ts, open, high, low, close, adj_close, volume "
+        "FROM price_bars WHERE " + " AND ".join(clauses)
+        + f" ORDER BY ts DESC LIMIT ${len(args)}) bars ORDER BY ts"
+    )
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(sql, *args)
+    return [{**dict(r), "ts": r["ts"].isoformat()} for r in rows]
@@ -1,20 +1,40 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from datetime import date, datetime
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING
 
 import app.database as db
-
-
-async def read_watchlist() -> list[str]:
-    async with db.get_pool().acquire() as conn:
+from app.config import CALENDAR_INDEX_ENABLED, CALENDAR_INDEX_PAST_DAYS, STOCK_DATASETS
+from app.events import calendar_events
+from app.impacts import normalize_impacts
+from app.storage.calendar_index import calendar_index, index_start
+from app.storage.changes import format_cursor, parse_cursor, read_change_horizon, read_changes
+from app.storage.partitions import ensure_partitions
+from app.timing import phase
+
+if TYPE_CHECKING:
+    import asyncpg
+
+# Serialises index rebuilds and change-feed refreshes.
+_index_lock = asyncio.Lock()
+_INDEX_REFRESH_PAGE = 5000
+# change_seq -> change_xid of calendar rows this process already published to
+# SSE subscribers, so the change feed does not publish them a second time.
+# Pruned once the feed cursor has passed them.
+_published_seqs: dict[int, int] = {}
+
+
+async def read_watchlist(*, primary: bool = False) -> list[str]:
+    async with db.reader_conn(primary) as conn:
         rows = await conn.fetch("SELECT ticker FROM watchlist ORDER BY ticker")
     return [r["ticker"] for r in rows]
 
 
 async def add_to_watchlist(ticker: str) -> None:
     upper = ticker.upper()
-    async with db.get_pool().acquire() as conn:
+    async with db.write_conn() as conn:
         await conn.execute(
             "INSERT INTO watchlist (ticker) VALUES ($1) ON CONFLICT DO NOTHING",
             upper,
@@ -23,13 +43,13 @@ async def add_to_watchlist(ticker: str) -> None:
 
 async def remove_from_watchlist(ticker: str) -> None:
     upper = ticker.upper()
-    async with db.get_pool().acquire() as conn:
+    async with db.write_conn() as conn:
         await conn.execute("DELETE FROM watchlist WHERE ticker = $1", upper)
 
 
 async def read_stock(ticker: str) -> dict | None:
     upper = ticker.upper()
-    async with db.get_pool().acquire() as conn:
+    async with db.read_conn() as conn:
         cal = await conn.fetchrow(
             "SELECT * FROM stock_calendar WHERE ticker = $1", upper
         )
@@ -50,85 +70,199 @@ async def read_stock(ticker: str) -> dict | None:
     if not cal and not earnings and not dividends and not splits:
         return None
 
-    calendar_data = None
-    if cal:
-        earnings_dates = cal["earnings_dates"]
-        if isinstance(earnings_dates, str):
-            earnings_dates = json.loads(earnings_dates)
-        calendar_data = {
-            "dividend_date": _date_str(cal["dividend_date"]),
-            "ex_dividend_date": _date_str(cal["ex_dividend_date"]),
-            "earnings_dates": earnings_dates,
-            "earnings_high": cal["earnings_high"],
-            "earnings_low": cal["earnings_low"],
-            "earnings_average": cal["earnings_average"],
-            "revenue_high": cal["revenue_high"],
-            "revenue_low": cal["revenue_low"],
-            "revenue_average": cal["revenue_average"],
-        }
-
     return {
-        "calendar": calendar_data,
-        "earnings": [
-            {
-                "date": r["date"].isoformat() if r["date"] else None,
-                "eps_estimate": r["eps_estimate"],
-                "reported_eps": r["reported_eps"],
-                "surprise_pct": r["surprise_pct"],
-            }
-            for r in earnings
-        ],
-        "dividends": [
-            {"date": _date_str(r["date"]), "amount": r["amount"]}
-            for r in dividends
-        ],
-        "splits": [
-            {"date": _date_str(r["date"]), "ratio": r["ratio"]}
-            for r in splits
-        ],
+        "calendar": _stock_calendar_item(cal) if cal else None,
+        "earnings": [_stock_earnings_item(r) for r in earnings],
+        "dividends": [_stock_dividend_item(r) for r in dividends],
+        "splits": [_stock_split_item(r) for r in splits],
     }
 
 
-async def write_stock(ticker: str, data: dict) -> None:
+async def has_stock(ticker: str, *, primary: bool = False) -> bool:
+    """True once the ticker has been synced at least once.
+
+    Pass ``primary=True`` right after a sync; the replica may lag behind it.
+    """
+    upper = ticker.upper()
+    async with db.reader_conn(primary) as conn:
+        return await conn.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM stock_calendar WHERE ticker = $1) "
+            "OR EXISTS (SELECT 1 FROM stock_fetch_state WHERE ticker = $1)",
+            upper,
+        )
+
+
+async def read_stock_calendar(ticker: str, *, primary: bool = False) -> dict | None:
+    async with db.reader_conn(primary) as conn:
+        cal = await conn.fetchrow(
+            "SELECT * FROM stock_calendar WHERE ticker = $1", ticker.upper()
+        )
+    return _stock_calendar_item(cal) if cal else None
+
+
+async def read_stock_earnings(
+    ticker: str,
+    limit: int | None = None,
+    offset: int = 0,
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    primary: bool = False,
+) -> list[dict]:
+    rows = await _read_ticker_history(
+        "stock_earnings", "date, eps_estimate, reported_eps, surprise_pct",
+        ticker, limit, offset, start, end, timestamped=True, primary=primary,
+    )
+    return [_stock_earnings_item(r) for r in rows]
+
+
+async def read_stock_dividends(
+    ticker: str,
+    limit: int | None = None,
+    offset: int = 0,
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    primary: bool = False,
+) -> list[dict]:
+    rows = await _read_ticker_history(
+        "stock_dividends", "date, amount", ticker, limit, offset, start, end,
+        primary=primary,
+    )
+    return [_stock_dividend_item(r) for r in rows]
+
+
+async def read_stock_splits(
+    ticker: str,
+    limit: int | None = None,
+    offset: int = 0,
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    primary: bool = False,
+) -> list[dict]:
+    rows = await _read_ticker_history(
+        "stock_splits", "date, ratio", ticker, limit, offset, start, end,
+        primary=primary,
+    )
+    return [_stock_split_item(r) for r in rows]
+
+
+async def _read_ticker_history(
+    table: str,
+    columns: str,
+    ticker: str,
+    limit: int | None,
+    offset: int,
+    start: date | None,
+    end: date | None,
+    timestamped: bool = False,
+    primary: bool = False,
+) -> list:
+    """Newest-first rows of one per-ticker table, bounded and paged in SQL.
+
+    Served by the ``(ticker, date)`` unique index; a NULL limit means no limit.
+    """
+    clauses = ["ticker = $1"]
+    args: list = [ticker.upper()]
+    if start:
+        args.append(start)
+        clauses.append(
+            f"date >= {_day_start(len(args))}" if timestamped else f"date >= ${len(args)}"
+        )
+    if end:
+        args.append(end)
+        clauses.append(
+            f"date < {_day_end(len(args))}" if timestamped else f"date <= ${len(args)}"
+        )
+    args += [limit, offset]
+    sql = (
+        f"SELECT {columns} FROM {table} WHERE "
+        + " AND ".join(clauses)
+        + f" ORDER BY date DESC LIMIT ${len(args) - 1} OFFSET ${len(args)}"
+    )
+    async with db.reader_conn(primary) as conn:
+        return await conn.fetch(sql, *args)
+
+
+async def read_due_datasets(
+    cadences: dict[str, int], slack_seconds: int = 300,
+) -> dict[str, set[str]]:
+    """Return ``{ticker: datasets}`` for watchlist tickers with stale datasets.
+
+    A dataset is due when it has never been fetched or its last fetch is older
+    than its cadence (minus *slack_seconds*, so an hourly cadence is still due
+    on the next hourly run). Tickers with nothing due are omitted; the rest
+    come stalest first, so a run cut short favours the most out-of-date data.
+    """
+    names = list(cadences)
+    ages = [max(cadences[n] - slack_seconds, 0) for n in names]
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT w.ticker, array_agg(d.dataset) AS datasets
+            FROM watchlist w
+            CROSS JOIN unnest($1::text[], $2::int[]) AS d(dataset, max_age)
+            LEFT JOIN stock_fetch_state s
+                ON s.ticker = w.ticker AND s.dataset = d.dataset
+            WHERE s.fetched_at IS NULL
+               OR s.fetched_at < now() - make_interval(secs => d.max_age)
+            GROUP BY w.ticker
+            ORDER BY min(coalesce(s.fetched_at, '-infinity')), w.ticker
+            """,
+            names, ages,
+        )
+    return {r["ticker"]: set(r["datasets"]) for r in rows}
+
+
+async def write_stock(ticker: str, data: dict) -> int:
+    """Persist fetched stock data and return the number of rows upserted.
+
+    Only the datasets present as keys in *data* are written, and only those
+    have their last-fetched timestamp advanced, so partial fetches are safe.
+    """
     upper = ticker.upper()
     cal = data.get("calendar") or {}
     earnings_dates = cal.get("earnings_dates")
     if earnings_dates is not None:
         earnings_dates = json.dumps(earnings_dates, default=str)
 
-    async with db.get_pool().acquire() as conn:
+    written = 0
+    async with db.write_conn() as conn:
         async with conn.transaction():
             # Upsert calendar
-            await conn.execute(
-                """
-                INSERT INTO stock_calendar
-                    (ticker, dividend_date, ex_dividend_date, earnings_dates,
-                     earnings_high, earnings_low, earnings_average,
-                     revenue_high, revenue_low, revenue_average, updated_at)
-                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10, now())
-                ON CONFLICT (ticker) DO UPDATE SET
-                    dividend_date = EXCLUDED.dividend_date,
-                    ex_dividend_date = EXCLUDED.ex_dividend_date,
-                    earnings_dates = EXCLUDED.earnings_dates,
-                    earnings_high = EXCLUDED.earnings_high,
-                    earnings_low = EXCLUDED.earnings_low,
-                    earnings_average = EXCLUDED.earnings_average,
-                    revenue_high = EXCLUDED.revenue_high,
-                    revenue_low = EXCLUDED.revenue_low,
-                    revenue_average = EXCLUDED.revenue_average,
-                    updated_at = now()
-                """,
-                upper,
-                _to_date(cal.get("dividend_date")),
-                _to_date(cal.get("ex_dividend_date")),
-                earnings_dates,
-                _to_float(cal.get("earnings_high")),
-                _to_float(cal.get("earnings_low")),
-                _to_float(cal.get("earnings_average")),
-                _to_float(cal.get("revenue_high")),
-                _to_float(cal.get("revenue_low")),
-                _to_float(cal.get("revenue_average")),
-            )
+            if "calendar" in data:
+                await conn.execute(
+                    """
+                    INSERT INTO stock_calendar
+                        (ticker, dividend_date, ex_dividend_date, earnings_dates,
+                         earnings_high, earnings_low, earnings_average,
+                         revenue_high, revenue_low, revenue_average, updated_at)
+                    VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10, now())
+                    ON CONFLICT (ticker) DO UPDATE SET
+                        dividend_date = EXCLUDED.dividend_date,
+                        ex_dividend_date = EXCLUDED.ex_dividend_date,
+                        earnings_dates = EXCLUDED.earnings_dates,
+                        earnings_high = EXCLUDED.earnings_high,
+                        earnings_low = EXCLUDED.earnings_low,
+                        earnings_average = EXCLUDED.earnings_average,
+                        revenue_high = EXCLUDED.revenue_high,
+                        revenue_low = EXCLUDED.revenue_low,
+                        revenue_average = EXCLUDED.revenue_average,
+                        updated_at = now()
+                    """,
+                    upper,
+                    _to_date(cal.get("dividend_date")),
+                    _to_date(cal.get("ex_dividend_date")),
+                    earnings_dates,
+                    _to_float(cal.get("earnings_high")),
+                    _to_float(cal.get("earnings_low")),
+                    _to_float(cal.get("earnings_average")),
+                    _to_float(cal.get("revenue_high")),
+                    _to_float(cal.get("revenue_low")),
+                    _to_float(cal.get("revenue_average")),
+                )
+                written += 1
 
             # Upsert earnings
             for e in data.get("earnings", []):
@@ -149,6 +283,7 @@ async def write_stock(ticker: str, data: dict) -> None:
                     _to_float(e.get("reported_eps")),
                     _to_float(e.get("surprise_pct")),
                 )
+                written += 1
 
             # Upsert dividends
             for d in data.get("dividends", []):
@@ -163,6 +298,7 @@ async def write_stock(ticker: str, data: dict) -> None:
                     """,
                     upper, dt, _to_float(d.get("amount")),
                 )
+                written += 1
 
             # Upsert splits
             for s in data.get("splits", []):
@@ -177,25 +313,33 @@ async def write_stock(ticker: str, data: dict) -> None:
                     """,
                     upper, dt, s.get("ratio"),
                 )
+                written += 1
+
+            fetched = [name for name in STOCK_DATASETS if name in data]
+            await conn.execute(
+                """
+                INSERT INTO stock_fetch_state (ticker, dataset, fetched_at)
+                SELECT $1, unnest($2::text[]), now()
+                ON CONFLICT (ticker, dataset) DO UPDATE SET fetched_at = EXCLUDED.fetched_at
+                """,
+                upper, fetched,
+            )
+    return written
 
 
 async def read_earnings_calendar(
-    start: date | None = None, end: date | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    symbols: list[str] | None = None,
 ) -> dict[date, dict[str, list[dict]]]:
-    clauses = ["1=1"]
-    args: list = []
-    if start:
-        args.append(start)
-        clauses.append(f"date::date >= ${len(args)}")
-    if end:
-        args.append(end)
-        clauses.append(f"date::date <= ${len(args)}")
-    sql = (
-        "SELECT * FROM earnings_calendar WHERE "
-        + " AND ".join(clauses)
-        + " ORDER BY date::date DESC, id"
-    )
-    async with db.get_pool().acquire() as conn:
+    symbols = [s.upper() for s in symbols] if symbols else None
+    if calendar_index.covers(start):
+        with phase("index"):
+            return calendar_index.earnings(start, end, frozenset(symbols) if symbols else None)
+
+    where, args = _calendar_where(start, end, symbol=symbols)
+    sql = f"SELECT * FROM earnings_calendar WHERE {where} ORDER BY {_UTC_DAY} DESC, id"
+    async with db.read_conn() as conn:
         rows = await conn.fetch(sql, *args)
     result: dict[date, dict[str, list[dict]]] = {}
     for r in rows:
@@ -203,125 +347,479 @@ async def read_earnings_calendar(
         if day is None:
             continue
         company = r["company"] or r["symbol"]
-        item = {
-            "symbol": r["symbol"],
-            "marketcap": r["marketcap"],
-            "event_name": r["event_name"],
-            "date": r["date"].isoformat() if r["date"] else None,
-            "timing": r["timing"],
-            "eps_estimate": r["eps_estimate"],
-            "reported_eps": r["reported_eps"],
-            "surprise_pct": r["surprise_pct"],
-        }
-        result.setdefault(day, {}).setdefault(company, []).append(item)
+        result.setdefault(day, {}).setdefault(company, []).append(_earnings_item(r))
     return result
 
 
-async def write_earnings_calendar(data: dict[date, dict[str, list[dict]]]) -> None:
-    async with db.get_pool().acquire() as conn:
+async def read_earnings_calendar_json(
+    start: date | None = None,
+    end: date | None = None,
+    symbols: list[str] | None = None,
+) -> bytes:
+    """The ``/calendar/earnings`` response body, rendered entirely by Postgres.
+
+    Same shape and ordering as the route's Python path: days newest first,
+    companies in first-seen order, items by id.
+    """
+    where, args = _calendar_where(
+        start, end, symbol=[s.upper() for s in symbols] if symbols else None,
+    )
+    sql = f"""
+        WITH rows AS (
+            SELECT {_UTC_DAY} AS day, coalesce(company, symbol) AS company, id,
+                   json_build_object(
+                       'symbol', symbol,
+                       'marketcap', marketcap,
+                       'event_name', event_name,
+                       'date', {_JSON_TS},
+                       'timing', timing,
+                       'eps_estimate', eps_estimate,
+                       'reported_eps', reported_eps,
+                       'surprise_pct', surprise_pct
+                   ) AS item
+            FROM earnings_calendar WHERE {where}
+        ), companies AS (
+            SELECT day, company, min(id) AS first_id, json_agg(item ORDER BY id) AS items
+            FROM rows GROUP BY day, company
+        ), days AS (
+            SELECT day, json_object_agg(company, items ORDER BY first_id) AS companies
+            FROM companies GROUP BY day
+        )
+        SELECT coalesce(json_object_agg({_JSON_DAY}, companies ORDER BY day DESC), '{{}}')::text
+        FROM days
+    """
+    async with db.read_conn() as conn:
+        body = await conn.fetchval(sql, *args)
+    return body.encode()
+
+
+async def write_earnings_calendar(data: dict[date, dict[str, list[dict]]]) -> list[dict]:
+    """Upsert calendar rows; return (and publish) only rows that actually changed."""
+    return await write_earnings_calendar_rows([
+        {**item, "company": company}
+        for companies in data.values()
+        for company, items in companies.items()
+        for item in items
+    ])
+
+
+async def write_earnings_calendar_rows(items: list[dict]) -> list[dict]:
+    """Bulk-upsert flat earnings calendar items (each carrying ``company``).
+
+    The whole batch goes through one ``INSERT ... SELECT FROM unnest(...)``
+    statement in its own transaction. Returns (and publishes) only the rows
+    that were inserted or changed.
+    """
+    # One statement cannot upsert the same key twice; the last item wins.
+    latest: dict[tuple[str, datetime], dict] = {}
+    for item in items:
+        dt = _to_datetime(item.get("date"))
+        if dt is None:
+            continue
+        latest[(item.get("symbol") or "", dt)] = item
+    if not latest:
+        return []
+
+    columns: tuple[list, ...] = ([], [], [], [], [], [], [], [], [])
+    for (symbol, dt), item in latest.items():
+        for col, val in zip(columns, (
+            item.get("company") or symbol,
+            symbol,
+            _to_float(item.get("marketcap")),
+            item.get("event_name"),
+            dt,
+            item.get("timing"),
+            _to_float(item.get("eps_estimate")),
+            _to_float(item.get("reported_eps")),
+            _to_float(item.get("surprise_pct")),
+        )):
+            col.append(val)
+
+    async with db.write_conn() as conn:
+        await ensure_partitions(conn, "earnings_calendar", columns[4])
         async with conn.transaction():
-            for _day, companies in data.items():
-                for company, items in companies.items():
-                    for item in items:
-                        dt = _to_datetime(item.get("date"))
-                        await conn.execute(
-                            """
-                            INSERT INTO earnings_calendar
-                                (company, symbol, marketcap, event_name, date, timing,
-                                 eps_estimate, reported_eps, surprise_pct)
-                            VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9)
-                            ON CONFLICT (symbol, date) DO UPDATE SET
-                                company = EXCLUDED.company,
-                                marketcap = COALESCE(EXCLUDED.marketcap, earnings_calendar.marketcap),
-                                event_name = COALESCE(EXCLUDED.event_name, earnings_calendar.event_name),
-                                timing = COALESCE(EXCLUDED.timing, earnings_calendar.timing),
-                                eps_estimate = COALESCE(EXCLUDED.eps_estimate, earnings_calendar.eps_estimate),
-                                reported_eps = COALESCE(EXCLUDED.reported_eps, earnings_calendar.reported_eps),
-                                surprise_pct = COALESCE(EXCLUDED.surprise_pct, earnings_calendar.surprise_pct)
-                            """,
-                            company, item.get("symbol", ""),
-                            _to_float(item.get("marketcap")),
-                            item.get("event_name"),
-                            dt,
-                            item.get("timing"),
-                            _to_float(item.get("eps_estimate")),
-                            _to_float(item.get("reported_eps")),
-                            _to_float(item.get("surprise_pct")),
-                        )
+            rows = await conn.fetch(
+                """
+                INSERT INTO earnings_calendar
+                    (company, symbol, marketcap, event_name, date, timing,
+                     eps_estimate, reported_eps, surprise_pct)
+                SELECT * FROM unnest(
+                    $1::text[], $2::text[], $3::float8[], $4::text[], $5::timestamptz[],
+                    $6::text[], $7::float8[], $8::float8[], $9::float8[]
+                )
+                ON CONFLICT (symbol, date) DO UPDATE SET
+                    company = EXCLUDED.company,
+                    marketcap = COALESCE(EXCLUDED.marketcap, earnings_calendar.marketcap),
+                    event_name = COALESCE(EXCLUDED.event_name, earnings_calendar.event_name),
+                    timing = COALESCE(EXCLUDED.timing, earnings_calendar.timing),
+                    eps_estimate = COALESCE(EXCLUDED.eps_estimate, earnings_calendar.eps_estimate),
+                    reported_eps = COALESCE(EXCLUDED.reported_eps, earnings_calendar.reported_eps),
+                    surprise_pct = COALESCE(EXCLUDED.surprise_pct, earnings_calendar.surprise_pct)
+                WHERE (earnings_calendar.company, earnings_calendar.marketcap,
+                       earnings_calendar.event_name, earnings_calendar.timing,
+                       earnings_calendar.eps_estimate, earnings_calendar.reported_eps,
+                       earnings_calendar.surprise_pct)
+                    IS DISTINCT FROM
+                      (EXCLUDED.company,
+                       COALESCE(EXCLUDED.marketcap, earnings_calendar.marketcap),
+                       COALESCE(EXCLUDED.event_name, earnings_calendar.event_name),
+                       COALESCE(EXCLUDED.timing, earnings_calendar.timing),
+                       COALESCE(EXCLUDED.eps_estimate, earnings_calendar.eps_estimate),
+                       COALESCE(EXCLUDED.reported_eps, earnings_calendar.reported_eps),
+                       COALESCE(EXCLUDED.surprise_pct, earnings_calendar.surprise_pct))
+                RETURNING *
+                """,
+                *columns,
+            )
+            _mark_published(rows)
+    calendar_index.apply_earnings(rows)
+    changed = [_earnings_item(r) for r in rows]
+    calendar_events.publish("earnings", changed)
+    return changed
 
 
 async def read_economics_calendar(
-    start: date | None = None, end: date | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    currencies: list[str] | None = None,
+    impacts: list[str] | None = None,
 ) -> dict[date, list[dict]]:
-    clauses = ["1=1"]
-    args: list = []
-    if start:
-        args.append(start)
-        clauses.append(f"date::date >= ${len(args)}")
-    if end:
-        args.append(end)
-        clauses.append(f"date::date <= ${len(args)}")
+    currencies = [c.upper() for c in currencies] if currencies else None
+    impacts = normalize_impacts(impacts)
+    if calendar_index.covers(start):
+        with phase("index"):
+            return calendar_index.economics(
+                start, end,
+                frozenset(currencies) if currencies else None,
+                frozenset(impacts) if impacts else None,
+            )
+
+    where, args = _calendar_where(start, end, currency=currencies, impact=impacts)
     sql = (
-        "SELECT * FROM economics_calendar WHERE "
-        + " AND ".join(clauses)
-        + " ORDER BY date::date, is_all_day DESC, date, id"
+        f"SELECT * FROM economics_calendar WHERE {where} "
+        f"ORDER BY {_UTC_DAY}, is_all_day DESC, date, id"
     )
-    async with db.get_pool().acquire() as conn:
+    async with db.read_conn() as conn:
         rows = await conn.fetch(sql, *args)
     result: dict[date, list[dict]] = {}
     for r in rows:
         day = r["date"].date() if r["date"] else None
         if day is None:
             continue
-        item = {
-            "date": r["date"].isoformat() if r["date"] else None,
-            "is_all_day": r["is_all_day"],
-            "currency": r["currency"],
-            "impact": r["impact"],
-            "event": r["event"],
-            "actual": r["actual"],
-            "forecast": r["forecast"],
-            "previous": r["previous"],
-        }
-        result.setdefault(day, []).append(item)
+        result.setdefault(day, []).append(_economics_item(r))
     return result
 
 
-async def write_economics_calendar(data: dict[date, list[dict]]) -> None:
-    async with db.get_pool().acquire() as conn:
+async def read_economics_calendar_json(
+    start: date | None = None,
+    end: date | None = None,
+    currencies: list[str] | None = None,
+    impacts: list[str] | None = None,
+) -> bytes:
+    """The ``/calendar/economics`` response body, rendered entirely by Postgres."""
+    where, args = _calendar_where(
+        start, end,
+        currency=[c.upper() for c in currencies] if currencies else None,
+        impact=normalize_impacts(impacts),
+    )
+    sql = f"""
+        WITH days AS (
+            SELECT {_UTC_DAY} AS day,
+                   json_agg(
+                       json_build_object(
+                           'date', {_JSON_TS},
+                           'is_all_day', is_all_day,
+                           'currency', currency,
+                           'impact', impact,
+                           'event', event,
+                           'actual', actual,
+                           'forecast', forecast,
+                           'previous', previous
+                       ) ORDER BY is_all_day DESC, date, id
+                   ) AS items
+            FROM economics_calendar WHERE {where}
+            GROUP BY 1
+        )
+        SELECT coalesce(json_object_agg({_JSON_DAY}, items ORDER BY day), '{{}}')::text
+        FROM days
+    """
+    async with db.read_conn() as conn:
+        body = await conn.fetchval(sql, *args)
+    return body.encode()
+
+
+async def read_upcoming_releases(
+    start: datetime, end: datetime, impacts: list[str],
+) -> list[dict]:
+    """Timed economic events in ``[start, end]`` that have no ``actual`` yet."""
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT * FROM economics_calendar
+            WHERE date BETWEEN $1 AND $2
+              AND NOT is_all_day
+              AND actual IS NULL
+              AND impact = ANY($3::text[])
+            ORDER BY date, id
+            """,
+            start, end, normalize_impacts(impacts) or [],
+        )
+    return [_economics_item(r) for r in rows]
+
+
+async def write_economics_calendar(data: dict[date, list[dict]]) -> list[dict]:
+    """Upsert calendar rows; return (and publish) only rows that actually changed."""
+    rows = [
+        (ev, dt)
+        for events in data.values()
+        for ev in events
+        if ev.get("event") and (dt := _to_datetime(ev.get("date"))) is not None
+    ]
+    async with db.write_conn() as conn:
+        await ensure_partitions(conn, "economics_calendar", [dt for _, dt in rows])
+        changed: list[asyncpg.Record] = []
         async with conn.transaction():
-            for _day, events in data.items():
-                for ev in events:
-                    event_name = ev.get("event")
-                    if not event_name:
-                        continue
-                    dt = _to_datetime(ev.get("date"))
-                    await conn.execute(
-                        """
-                        INSERT INTO economics_calendar
-                            (date, is_all_day, currency, impact, event, actual, forecast, previous)
-                        VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
-                        ON CONFLICT (date, event) DO UPDATE SET
-                            is_all_day = EXCLUDED.is_all_day,
-                            currency = COALESCE(EXCLUDED.currency, economics_calendar.currency),
-                            impact = COALESCE(EXCLUDED.impact, economics_calendar.impact),
-                            actual = COALESCE(EXCLUDED.actual, economics_calendar.actual),
-                            forecast = COALESCE(EXCLUDED.forecast, economics_calendar.forecast),
-                            previous = COALESCE(EXCLUDED.previous, economics_calendar.previous)
-                        """,
-                        dt,
-                        ev.get("is_all_day", False),
-                        ev.get("currency"),
-                        ev.get("impact"),
-                        event_name,
-                        ev.get("actual"),
-                        ev.get("forecast"),
-                        ev.get("previous"),
+            for ev, dt in rows:
+                r = await conn.fetchrow(
+                    """
+                    INSERT INTO economics_calendar
+                        (date, is_all_day, currency, impact, event, actual, forecast, previous)
+                    VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
+                    ON CONFLICT (date, event) DO UPDATE SET
+                        is_all_day = EXCLUDED.is_all_day,
+                        currency = COALESCE(EXCLUDED.currency, economics_calendar.currency),
+                        impact = COALESCE(EXCLUDED.impact, economics_calendar.impact),
+                        actual = COALESCE(EXCLUDED.actual, economics_calendar.actual),
+                        forecast = COALESCE(EXCLUDED.forecast, economics_calendar.forecast),
+                        previous = COALESCE(EXCLUDED.previous, economics_calendar.previous)
+                    WHERE (economics_calendar.is_all_day, economics_calendar.currency,
+                           economics_calendar.impact, economics_calendar.actual,
+                           economics_calendar.forecast, economics_calendar.previous)
+                        IS DISTINCT FROM
+                          (EXCLUDED.is_all_day,
+                           COALESCE(EXCLUDED.currency, economics_calendar.currency),
+                           COALESCE(EXCLUDED.impact, economics_calendar.impact),
+                           COALESCE(EXCLUDED.actual, economics_calendar.actual),
+                           COALESCE(EXCLUDED.forecast, economics_calendar.forecast),
+                           COALESCE(EXCLUDED.previous, economics_calendar.previous))
+                    RETURNING *
+                    """,
+                    dt,
+                    ev.get("is_all_day", False),
+                    ev.get("currency"),
+                    ev.get("impact"),
+                    ev["event"],
+                    ev.get("actual"),
+                    ev.get("forecast"),
+                    ev.get("previous"),
+                )
+                if r is not None:
+                    changed.append(r)
+            _mark_published(changed)
+    calendar_index.apply_economics(changed)
+    items = [_economics_item(r) for r in changed]
+    calendar_events.publish("economics", items)
+    return items
+
+
+def _mark_published(rows: list) -> None:
+    """Record rows about to be published here, before their transaction commits.
+
+    Marking them first means a feed refresh that reads them right after the
+    commit already knows to skip them. Marks left by a rolled-back write are
+    pruned like any other.
+    """
+    if calendar_index.cursor is None:
+        return  # no feed refresh is running to skip them
+    for r in rows:
+        _published_seqs[r["change_seq"]] = r["change_xid"]
+
+
+async def load_calendar_index() -> None:
+    """(Re)build the in-process calendar index from the primary.
+
+    Rows and the change-feed horizon come from one snapshot, so
+    ``refresh_calendar_index`` picks up exactly where the rebuild left off. A
+    rebuild keeps an existing cursor, so changes not yet read from the feed are
+    still published. With the index disabled only the cursor is set: the feed
+    still fans out other processes' changes to SSE subscribers.
+    """
+    if not CALENDAR_INDEX_ENABLED:
+        if calendar_index.cursor is None:
+            async with db.write_conn() as conn:
+                calendar_index.cursor = format_cursor(await read_change_horizon(conn))
+        return
+    covered_from = index_start(CALENDAR_INDEX_PAST_DAYS)
+    async with _index_lock:
+        calendar_index.begin_reload()
+        try:
+            async with db.write_conn() as conn:
+                async with conn.transaction(isolation="repeatable_read", readonly=True):
+                    horizon = await read_change_horizon(conn)
+                    earnings = await conn.fetch(
+                        f"SELECT * FROM earnings_calendar WHERE date >= {_day_start(1)}",
+                        covered_from,
                     )
+                    economics = await conn.fetch(
+                        f"SELECT * FROM economics_calendar WHERE date >= {_day_start(1)}",
+                        covered_from,
+                    )
+        except BaseException:
+            calendar_index.abort_reload()
+            raise
+        cursor = calendar_index.cursor or format_cursor(horizon)
+        calendar_index.reset(covered_from, cursor, earnings, economics)
+
+
+async def refresh_calendar_index() -> int:
+    """Apply and publish calendar rows changed by any process since the cursor.
+
+    Reads the change feed from the primary; returns the number of rows seen.
+    Rows this process already published when it wrote them are applied but
+    not published again, so each change reaches every process's subscribers
+    once.
+    """
+    if calendar_index.cursor is None:
+        return 0
+    seen = 0
+    async with _index_lock:
+        while True:
+            page = await read_changes(
+                calendar_index.cursor, ["earnings_calendar", "economics_calendar"],
+                _INDEX_REFRESH_PAGE, primary=True,
+            )
+            earnings, economics = [], []
+            for change in page["changes"]:
+                row = change["row"]
+                if row.get("date") is None:
+                    continue
+                # to_jsonb renders timestamps in the session TimeZone.
+                row["date"] = datetime.fromisoformat(row["date"]).astimezone(timezone.utc)
+                row["change_seq"] = change["seq"]
+                (earnings if change["type"] == "earnings_calendar" else economics).append(row)
+            calendar_index.apply_earnings(earnings)
+            calendar_index.apply_economics(economics)
+            _publish_remote("earnings", earnings, _earnings_item)
+            _publish_remote("economics", economics, _economics_item)
+            calendar_index.cursor = page["next_cursor"]
+            seen += len(page["changes"])
+            if not page["has_more"]:
+                break
+        # Local rows the feed has moved past were either seen above or
+        # superseded by a later change.
+        done = parse_cursor(calendar_index.cursor)
+        for seq, xid in list(_published_seqs.items()):
+            if (xid, seq) <= done:
+                del _published_seqs[seq]
+    return seen
+
+
+def _publish_remote(kind: str, rows: list[dict], to_item) -> None:
+    calendar_events.publish(kind, [
+        to_item(r) for r in rows if _published_seqs.pop(r["change_seq"], None) is None
+    ])
 
 
 # --- helpers ---
 
+# Day labels and timestamps formatted the way the routes' pydantic path does.
+_JSON_DAY = "to_char(day, 'FMDay, MM/DD/YYYY')"
+_JSON_TS = """to_char(date AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"')"""
+# Calendar days are UTC days whatever the session TimeZone, as in the Python
+# path (asyncpg returns UTC datetimes) and the in-memory index.
+_UTC_DAY = "(date AT TIME ZONE 'UTC')::date"
+
+
+def _day_start(n: int) -> str:
+    """UTC midnight opening the date in parameter ``$n``."""
+    return f"(${n}::date::timestamp AT TIME ZONE 'UTC')"
+
+
+def _day_end(n: int) -> str:
+    """UTC midnight closing the date in parameter ``$n``."""
+    return f"((${n}::date + 1)::timestamp AT TIME ZONE 'UTC')"
+
+
+def _calendar_where(
+    start: date | None, end: date | None, **any_of: list[str] | None,
+) -> tuple[str, list]:
+    """WHERE clause for calendar range reads plus ``column = ANY(...)`` filters."""
+    clauses = ["1=1"]
+    args: list = []
+    for column, values in any_of.items():
+        if values:
+            args.append(values)
+            clauses.append(f"{column} = ANY(${len(args)}::text[])")
+    # Compare the raw partition key (not date::date) so the planner can prune.
+    if start:
+        args.append(start)
+        clauses.append(f"date >= {_day_start(len(args))}")
+    if end:
+        args.append(end)
+        clauses.append(f"date < {_day_end(len(args))}")
+    return " AND ".join(clauses), args
+
+
+def _stock_calendar_item(cal) -> dict:
+    earnings_dates = cal["earnings_dates"]
+    if isinstance(earnings_dates, str):
+        earnings_dates = json.loads(earnings_dates)
+    return {
+        "dividend_date": _date_str(cal["dividend_date"]),
+        "ex_dividend_date": _date_str(cal["ex_dividend_date"]),
+        "earnings_dates": earnings_dates,
+        "earnings_high": cal["earnings_high"],
+        "earnings_low": cal["earnings_low"],
+        "earnings_average": cal["earnings_average"],
+        "revenue_high": cal["revenue_high"],
+        "revenue_low": cal["revenue_low"],
+        "revenue_average": cal["revenue_average"],
+    }
+
+
+def _stock_earnings_item(r) -> dict:
+    return {
+        "date": r["date"].isoformat() if r["date"] else None,
+        "eps_estimate": r["eps_estimate"],
+        "reported_eps": r["reported_eps"],
+        "surprise_pct": r["surprise_pct"],
+    }
+
+
+def _stock_dividend_item(r) -> dict:
+    return {"date": _date_str(r["date"]), "amount": r["amount"]}
+
+
+def _stock_split_item(r) -> dict:
+    return {"date": _date_str(r["date"]), "ratio": r["ratio"]}
+
+
+def _earnings_item(r) -> dict:
+    return {
+        "symbol": r["symbol"],
+        "marketcap": r["marketcap"],
+        "event_name": r["event_name"],
+        "date": r["date"].isoformat() if r["date"] else None,
+        "timing": r["timing"],
+        "eps_estimate": r["eps_estimate"],
+        "reported_eps": r["reported_eps"],
+        "surprise_pct": r["surprise_pct"],
+    }
+
+
+def _economics_item(r) -> dict:
+    return {
+        "date": r["date"].isoformat() if r["date"] else None,
+        "is_all_day": r["is_all_day"],
+        "currency": r["currency"],
+        "impact": r["impact"],
+        "event": r["event"],
+        "actual": r["actual"],
+        "forecast": r["forecast"],
+        "previous": r["previous"],
+    }
+
+
 def _date_str(val) -> str | None:
     if val is None:
         return None
@@ -0,0 +1,207 @@
+"""Columnar Parquet snapshots of the data tables.
+
+Export reads every table inside one repeatable-read transaction (so the
+snapshot is consistent) through a server-side cursor and writes one
+zstd-compressed Parquet file per table plus a ``manifest.json``. Import
+replaces the tables' contents by bulk-loading the files with binary ``COPY``.
+
+Needs the optional ``snapshots`` extra (pyarrow)::
+
+    uv run python -m app.storage.snapshots export [name]
+    uv run python -m app.storage.snapshots import <name>
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import app.database as db
+from app.config import SNAPSHOT_DIR
+from app.storage.queries import load_calendar_index
+
+log = logging.getLogger(__name__)
+
+# Parents before children; sync-run history is operational data and is skipped.
+SNAPSHOT_TABLES = (
+    "watchlist",
+    "stock_calendar",
+    "stock_earnings",
+    "stock_dividends",
+    "stock_splits",
+    "stock_fetch_state",
+    "earnings_calendar",
+    "economics_calendar",
+    "price_bars",
+)
+# Partitioned tables and the column they are ranged on.
+_PARTITIONED = {
+    "earnings_calendar": "date",
+    "economics_calendar": "date",
+    "price_bars": "ts",
+}
+_BATCH_ROWS = 50_000
+_NAME_RE = re.compile(r"\w[\w.-]*")
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise SnapshotError("pyarrow is not installed; install the 'snapshots' extra") from exc
+    return pa, pc, pq
+
+
+def _arrow_type(pa, pg_type: str):
+    types = {
+        "int2": pa.int16(),
+        "int4": pa.int32(),
+        "int8": pa.int64(),
+        "float4": pa.float32(),
+        "float8": pa.float64(),
+        "bool": pa.bool_(),
+        "date": pa.date32(),
+        "timestamptz": pa.timestamp("us", tz="UTC"),
+        "timestamp": pa.timestamp("us"),
+        "_text": pa.list_(pa.string()),
+    }
+    # text, jsonb (asyncpg decodes it to a JSON string) and anything else.
+    return types.get(pg_type, pa.string())
+
+
+def snapshot_path(name: str) -> Path:
+    if not _NAME_RE.fullmatch(name):
+        raise SnapshotError(f"Invalid snapshot name: {name!r}")
+    return Path(SNAPSHOT_DIR) / name
+
+
+def list_snapshots() -> list[dict]:
+    root = Path(SNAPSHOT_DIR)
+    if not root.is_dir():
+        return []
+    return [
+        {"name": p.parent.name, **json.loads(p.read_text())}
+        for p in sorted(root.glob("*/manifest.json"), reverse=True)
+    ]
+
+
+async def export_snapshot(name: str | None = None) -> dict:
+    pa, _pc, pq = _pyarrow()
+    name = name or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    target = snapshot_path(name)
+    target.mkdir(parents=True, exist_ok=False)
+
+    manifest: dict = {"created_at": datetime.now(timezone.utc).isoformat(), "tables": {}}
+    async with db.read_conn() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            manifest["schema_version"] = await conn.fetchval(
+                "SELECT max(version) FROM schema_migrations"
+            )
+            for table in SNAPSHOT_TABLES:
+                stmt = await conn.prepare(f"SELECT * FROM {table}")
+                schema = pa.schema([
+                    (a.name, _arrow_type(pa, a.type.name)) for a in stmt.get_attributes()
+                ])
+                path = target / f"{table}.parquet"
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+                rows = 0
+                try:
+                    cursor = await stmt.cursor()
+                    while batch := await cursor.fetch(_BATCH_ROWS):
+                        columns = list(zip(*batch))
+                        record_batch = pa.record_batch(
+                            [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                            schema=schema,
+                        )
+                        await asyncio.to_thread(writer.write_batch, record_batch)
+                        rows += len(batch)
+                finally:
+                    writer.close()
+                manifest["tables"][table] = {"file": path.name, "rows": rows}
+                log.info("Exported %d rows from %s", rows, table)
+
+    (target / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return {"name": name, **manifest}
+
+
+async def import_snapshot(name: str) -> dict:
+    """Replace the contents of every table in the snapshot with its rows."""
+    _pa, pc, pq = _pyarrow()
+    source = snapshot_path(name)
+    manifest_path = source / "manifest.json"
+    if not manifest_path.is_file():
+        raise SnapshotError(f"No snapshot named {name!r}")
+    manifest = json.loads(manifest_path.read_text())
+    tables = [t for t in SNAPSHOT_TABLES if t in manifest["tables"]]
+
+    async with db.write_conn() as conn:
+        current = await conn.fetchval("SELECT max(version) FROM schema_migrations")
+        if (manifest.get("schema_version") or 0) > current:
+            raise SnapshotError(
+                f"Snapshot schema version {manifest['schema_version']} is newer than the database ({current})"
+            )
+
+        # Partitions must exist before COPY routes rows into them.
+        for table in tables:
+            key = _PARTITIONED.get(table)
+            if key is None:
+                continue
+            values = pq.read_table(source / f"{table}.parquet", columns=[key]).column(key)
+            bounds = pc.min_max(values).as_py()
+            if bounds["min"] is not None:
+                await conn.execute(
+                    "SELECT ensure_calendar_partitions($1, $2, $3)",
+                    table, bounds["min"], bounds["max"],
+                )
+
+        counts: dict[str, int] = {}
+        async with conn.transaction():
+            await conn.execute(f"TRUNCATE {', '.join(tables)}")
+            for table in tables:
+                parquet = pq.ParquetFile(source / f"{table}.parquet")
+                columns = parquet.schema_arrow.names
+                counts[table] = 0
+                for batch in parquet.iter_batches(batch_size=_BATCH_ROWS):
+                    records = list(zip(*(col.to_pylist() for col in batch.columns)))
+                    await conn.copy_records_to_table(table, records=records, columns=columns)
+                    counts[table] += len(records)
+                if "id" in columns:
+                    await conn.execute(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"coalesce((SELECT max(id) FROM {table}), 0) + 1, false)"
+                    )
+                log.info("Imported %d rows into %s", counts[table], table)
+
+    await load_calendar_index()
+    return {"name": name, "tables": counts}
+
+
+async def _main(argv: list[str]) -> int:
+    if not argv or argv[0] not in ("export", "import") or (argv[0] == "import" and len(argv) < 2):
+        print("usage: python -m app.storage.snapshots export [name] | import <name>")
+        return 2
+    await db.init_db()
+    try:
+        if argv[0] == "export":
+            result = await export_snapshot(argv[1] if len(argv) > 1 else None)
+        else:
+            result = await import_snapshot(argv[1])
+    finally:
+        await db.close_db()
+    print(json.dumps(result, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import os
+import socket
+import uuid
+from typing import TYPE_CHECKING
+
+import app.database as db
+from app.config import SYNC_RESUME_MAX_AGE_SECONDS, SYNC_RUN_LEASE_SECONDS, SYNC_RUN_RETENTION_DAYS
+
+if TYPE_CHECKING:
+    import asyncpg
+
+# Identifies this process as the owner of the runs it executes.
+SYNC_RUN_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Serialises claiming and starting runs across processes (transaction-scoped).
+_CLAIM_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('sync_runs'))"
+
+
+class SyncRunBusy(RuntimeError):
+    """Another live process owns a running sync run."""
+
+
+async def _raise_if_busy(conn: asyncpg.Connection) -> None:
+    run_id = await conn.fetchval(
+        """
+        SELECT id FROM sync_runs
+        WHERE status = 'running' AND owner <> $1
+          AND heartbeat_at > now() - make_interval(secs => $2)
+        ORDER BY id DESC LIMIT 1
+        """,
+        SYNC_RUN_OWNER, SYNC_RUN_LEASE_SECONDS,
+    )
+    if run_id is not None:
+        raise SyncRunBusy(f"Sync run {run_id} is owned by another live process")
+
+
+async def start_sync_run(plan: dict[str, set[str]]) -> int:
+    """Record and claim a new run with one pending checkpoint row per ticker, in plan order.
+
+    Raises ``SyncRunBusy`` if another process started one meanwhile.
+    """
+    tickers = list(plan)
+    async with db.write_conn() as conn:
+        async with conn.transaction():
+            await conn.execute(_CLAIM_LOCK_SQL)
+            await _raise_if_busy(conn)
+            run_id = await conn.fetchval(
+                """
+                INSERT INTO sync_runs (total, owner, heartbeat_at) VALUES ($1, $2, now())
+                RETURNING id
+                """,
+                len(tickers), SYNC_RUN_OWNER,
+            )
+            await conn.executemany(
+                """
+                INSERT INTO sync_run_tickers (run_id, ticker, position, datasets)
+                VALUES ($1, $2, $3, $4)
+                """,
+                [(run_id, t, i, sorted(plan[t])) for i, t in enumerate(tickers)],
+            )
+    return run_id
+
+
+async def resume_sync_run() -> tuple[int, list[tuple[str, set[str], int]]] | None:
+    """Claim the newest unfinished run and return its remaining tickers, if resumable.
+
+    Raises ``SyncRunBusy`` while another process holds a live claim on a
+    running run. Older unfinished runs, and the newest one when it is past
+    ``SYNC_RESUME_MAX_AGE_SECONDS``, are marked interrupted instead.
+    Remaining tickers come back as ``(ticker, datasets, attempts)`` in the
+    original order.
+    """
+    async with db.write_conn() as conn:
+        async with conn.transaction():
+            await conn.execute(_CLAIM_LOCK_SQL)
+            await _raise_if_busy(conn)
+            run = await conn.fetchrow(
+                """
+                UPDATE sync_runs SET owner = $2, heartbeat_at = now()
+                WHERE id = (
+                    SELECT id FROM sync_runs
+                    WHERE status = 'running'
+                      AND started_at > now() - make_interval(secs => $1)
+                    ORDER BY id DESC LIMIT 1
+                )
+                RETURNING id
+                """,
+                SYNC_RESUME_MAX_AGE_SECONDS, SYNC_RUN_OWNER,
+            )
+            await conn.execute(
+                """
+                UPDATE sync_runs SET status = 'interrupted', finished_at = now()
+                WHERE status = 'running' AND id <> coalesce($1, 0)
+                """,
+                run["id"] if run else None,
+            )
+            if run is None:
+                return None
+            rows = await conn.fetch(
+                """
+                SELECT ticker, datasets, attempts FROM sync_run_tickers
+                WHERE run_id = $1 AND status IN ('pending', 'throttled')
+                ORDER BY position
+                """,
+                run["id"],
+            )
+    return run["id"], [(r["ticker"], set(r["datasets"]), r["attempts"]) for r in rows]
+
+
+async def heartbeat_sync_run(run_id: int) -> bool:
+    """Refresh this process's claim on *run_id*; False if it has been taken over."""
+    async with db.write_conn() as conn:
+        status = await conn.execute(
+            "UPDATE sync_runs SET heartbeat_at = now() WHERE id = $1 AND owner = $2",
+            run_id, SYNC_RUN_OWNER,
+        )
+    return status != "UPDATE 0"
+
+
+async def write_sync_checkpoint(
+    run_id: int,
+    ticker: str,
+    status: str,
+    attempts: int,
+    duration_ms: float,
+    rows_written: int | None = None,
+    error: str | None = None,
+) -> bool:
+    """Record one ticker's outcome and refresh the claim.
+
+    Returns False (writing nothing) if another process has taken the run over.
+    """
+    async with db.write_conn() as conn:
+        async with conn.transaction():
+            owned = await conn.execute(
+                "UPDATE sync_runs SET heartbeat_at = now() WHERE id = $1 AND owner = $2",
+                run_id, SYNC_RUN_OWNER,
+            )
+            if owned == "UPDATE 0":
+                return False
+            await conn.execute(
+                """
+                UPDATE sync_run_tickers SET
+                    status = $3, attempts = $4, finished_at = now(),
+                    duration_ms = $5, rows_written = $6, error = $7
+                WHERE run_id = $1 AND ticker = $2
+                """,
+                run_id, ticker, status, attempts, duration_ms, rows_written, error,
+            )
+    return True
+
+
+async def finish_sync_run(run_id: int) -> None:
+    async with db.write_conn() as conn:
+        await conn.execute(
+            """
+            UPDATE sync_runs SET status = 'completed', finished_at = now()
+            WHERE id = $1 AND owner = $2
+            """,
+            run_id, SYNC_RUN_OWNER,
+        )
+        await conn.execute(
+            "DELETE FROM sync_runs WHERE started_at < now() - make_interval(days => $1)",
+            SYNC_RUN_RETENTION_DAYS,
+        )
+
+
+async def read_sync_runs(limit: int = 20) -> list[dict]:
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT r.id, r.started_at, r.finished_at, r.status, r.total,
+                   count(*) FILTER (WHERE t.status = 'ok') AS ok,
+                   count(*) FILTER (WHERE t.status = 'failed') AS failed,
+                   count(*) FILTER (WHERE t.status = 'throttled') AS throttled,
+                   count(*) FILTER (WHERE t.status = 'pending') AS pending,
+                   coalesce(sum(t.rows_written), 0) AS rows_written
+            FROM sync_runs r
+            LEFT JOIN sync_run_tickers t ON t.run_id = r.id
+            GROUP BY r.id
+            ORDER BY r.id DESC
+            LIMIT $1
+            """,
+            limit,
+        )
+    return [
+        {
+            **dict(r),
+            "started_at": r["started_at"].isoformat(),
+            "finished_at": r["finished_at"].isoformat() if r["finished_at"] else None,
+        }
+        for r in rows
+    ]
+
+
+async def read_sync_run_tickers(run_id: int) -> list[dict]:
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT ticker, datasets, status, attempts, finished_at,
+                   duration_ms, rows_written, error
+            FROM sync_run_tickers WHERE run_id = $1 ORDER BY position
+            """,
+            run_id,
+        )
+    return [
+        {**dict(r), "finished_at": r["finished_at"].isoformat() if r["finished_at"] else None}
+        for r in rows
+    ]
+
+
+async def read_slowest_tickers(days: int = 7, limit: int = 20) -> list[dict]:
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT ticker, count(*) AS syncs,
+                   avg(duration_ms) AS avg_ms, max(duration_ms) AS max_ms
+            FROM sync_run_tickers
+            WHERE status = 'ok' AND finished_at > now() - make_interval(days => $1)
+            GROUP BY ticker
+            ORDER BY avg(duration_ms) DESC
+            LIMIT $2
+            """,
+            days, limit,
+        )
+    return [dict(r) for r in rows]
+
+
+async def read_failing_tickers(days: int = 7, limit: int = 20) -> list[dict]:
+    async with db.read_conn() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT ticker,
+                   count(*) FILTER (WHERE status = 'failed') AS failed,
+                   count(*) FILTER (WHERE status = 'throttled') AS throttled,
+                   count(*) AS attempts,
+                   (array_agg(error ORDER BY finished_at DESC)
+                       FILTER (WHERE error IS NOT NULL))[1] AS last_error
+            FROM sync_run_tickers
+            WHERE finished_at > now() - make_interval(days => $1)
+            GROUP BY ticker
+            HAVING count(*) FILTER (WHERE status IN ('failed', 'throttled')) > 0
+            ORDER BY count(*) FILTER (WHERE status = 'failed') DESC,
+                     count(*) FILTER (WHERE status = 'throttled') DESC
+            LIMIT $2
+            """,
+            days, limit,
+        )
+    return [dict(r) for r in rows]
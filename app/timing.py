@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestTiming:
+    """Phase timings for one request.
+
+    ``phases`` maps name -> [milliseconds, count]. Time spent in phases that
+    are nested inside another phase (e.g. DB writes inside an upstream sync)
+    is reported under its own name but only counted once in ``accounted``.
+    """
+
+    __slots__ = ("phases", "accounted", "depth")
+
+    def __init__(self) -> None:
+        self.phases: dict[str, list[float]] = {}
+        self.accounted = 0.0
+        self.depth = 0
+
+
+# None outside a request (background jobs), where recording is a no-op.
+_current: ContextVar[RequestTiming | None] = ContextVar("server_timing", default=None)
+
+
+def record(name: str, ms: float) -> None:
+    timing = _current.get()
+    if timing is None:
+        return
+    entry = timing.phases.setdefault(name, [0.0, 0])
+    entry[0] += ms
+    entry[1] += 1
+    if timing.depth == 0:
+        timing.accounted += ms
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as *name* in the current request's Server-Timing."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    timing.depth += 1
+    try:
+        yield
+    finally:
+        timing.depth -= 1
+        record(name, (time.perf_counter() - start) * 1000)
+
+
+def _header(timing: RequestTiming, total_ms: float) -> bytes:
+    parts = []
+    for name, (ms, count) in timing.phases.items():
+        desc = f';desc="x{count}"' if count > 1 else ""
+        parts.append(f"{name};dur={ms:.2f}{desc}")
+    # Routing, response serialization and anything not instrumented.
+    parts.append(f"other;dur={max(total_ms - timing.accounted, 0.0):.2f}")
+    parts.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(parts).encode()
+
+
+class ServerTimingMiddleware:
+    """Adds a ``Server-Timing`` header with the phases recorded during the request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _header(timing, total_ms)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
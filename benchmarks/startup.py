@@ -0,0 +1,76 @@
+"""Startup-time benchmark.
+
+Measures how long a fresh interpreter takes to import ``app.main`` and, with
+``--db``, to run ``init_db()`` (pool creation + migration check) against
+``DATABASE_URL``. Fails if any fetch-only dependency is imported eagerly or the
+total exceeds the budget.
+
+    uv run python -m benchmarks.startup --runs 5 --db
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules that must only load inside fetch workers, never on the request path.
+HEAVY_MODULES = ("yfinance", "pandas", "lxml", "curl_cffi")
+
+_PROBE = """
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+result = {{"import_ms": (t1 - t0) * 1000, "db_ms": 0.0}}
+if {with_db}:
+    from app.database import close_db, init_db
+    async def _boot():
+        t = time.perf_counter()
+        await init_db()
+        result["db_ms"] = (time.perf_counter() - t) * 1000
+        await close_db()
+    asyncio.run(_boot())
+result["heavy"] = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps(result))
+"""
+
+
+def _run_once(with_db: bool) -> dict:
+    code = _PROBE.format(with_db=with_db, heavy=HEAVY_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", action="store_true", help="also time init_db()")
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    runs = [_run_once(args.db) for _ in range(args.runs)]
+    import_ms = statistics.median(r["import_ms"] for r in runs)
+    db_ms = statistics.median(r["db_ms"] for r in runs)
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+
+    print(f"import app.main  median {import_ms:8.1f} ms")
+    if args.db:
+        print(f"init_db()        median {db_ms:8.1f} ms")
+    print(f"total            median {import_ms + db_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    ok = True
+    if heavy:
+        print(f"FAIL: eagerly imported {', '.join(heavy)}")
+        ok = False
+    if import_ms + db_ms > args.budget_ms:
+        print("FAIL: over startup budget")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())